@@ -0,0 +1,78 @@
+"""Decode throughput of a 1000 item _bulk page of games, as requested by
+search_game(bulk=True) and GameIndex.update. Run from the repository root, e.g.
+    python bench_decode.py >> bench_output.txt
+"""
+
+import json
+import time
+import requests
+from srcomapipy import jsonlib
+from srcomapipy.srctypes import Game
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+API = "https://www.speedrun.com/api/v1/"
+
+
+def page() -> bytes:
+    games = [
+        {
+            "id": f"{i:08x}",
+            "names": {
+                "international": f"Game {i}",
+                "japanese": None,
+                "twitch": f"Game {i}",
+            },
+            "abbreviation": f"game{i}",
+            "weblink": f"https://www.speedrun.com/game{i}",
+        }
+        for i in range(1000)
+    ]
+    next_page = API + "games?_bulk=yes&max=1000&offset=1000"
+    body = {
+        "data": games,
+        "pagination": {
+            "offset": 0,
+            "max": 1000,
+            "size": 1000,
+            "links": [{"rel": "next", "uri": next_page}],
+        },
+    }
+    return json.dumps(body).encode()
+
+
+def bench(name: str, decode, size: int, repeat: int = 200):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        decode()
+        best = min(best, time.perf_counter() - start)
+    print(f"{name:40} {best * 1000:6.2f} ms/page {size / best / 2**20:7.1f} MiB/s")
+
+
+def main():
+    raw = page()
+    response = requests.models.Response()
+    response._content = raw
+    response.status_code = 200
+    response.encoding = "utf-8"
+    print(f"1000 item _bulk page of games, {len(raw) / 1024:.0f} KiB")
+    # the body used to be parsed for the status, pagination, links and data
+    bench("response.json() x3", lambda: [response.json() for _ in range(3)], len(raw))
+    bench("response.json()", response.json, len(raw))
+    bench("json.loads(content)", lambda: json.loads(raw), len(raw))
+    if orjson is not None:
+        bench("orjson.loads(content)", lambda: orjson.loads(raw), len(raw))
+    bench("jsonlib.loads (SRC default)", lambda: jsonlib.loads(raw), len(raw))
+    bench(
+        "jsonlib.loads + bulk Games",
+        lambda: [Game(g, True) for g in jsonlib.loads(raw)["data"]],
+        len(raw),
+    )
+
+
+if __name__ == "__main__":
+    main()
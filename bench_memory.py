@@ -0,0 +1,205 @@
+"""Memory per object of the srctypes classes, with and without keeping the
+raw payload, against the classes before they had __slots__ as a baseline.
+The baseline is loaded from the first commit of the repository, so run it
+from the repository root, e.g.
+    python bench_memory.py >> bench_output.txt
+"""
+
+import gc
+import json
+import subprocess
+import tracemalloc
+from types import ModuleType
+from typing import Optional
+from srcomapipy.srctypes import Run, Game, Category, Registry
+
+N = 2000
+
+
+def user(i: int) -> dict:
+    return {
+        "id": f"u{i}",
+        "names": {"international": f"User{i}", "japanese": None},
+        "weblink": f"https://www.speedrun.com/user/User{i}",
+        "pronouns": None,
+        "role": "user",
+        "rel": "user",
+        "signup": "2020-01-01T00:00:00Z",
+        "location": None,
+        "links": [
+            {"rel": "runs", "uri": f"https://www.speedrun.com/api/v1/runs?user=u{i}"}
+        ],
+    }
+
+
+def variable(i: int) -> dict:
+    return {
+        "id": f"v{i}",
+        "name": f"Variable {i}",
+        "category": None,
+        "scope": {"type": "full-game"},
+        "mandatory": True,
+        "user-defined": False,
+        "obsoletes": True,
+        "values": {
+            "values": {f"v{i}{c}": {"label": c, "rules": None} for c in "ABCD"},
+            "default": f"v{i}A",
+        },
+        "is-subcategory": True,
+        "links": [],
+    }
+
+
+def category(i: int) -> dict:
+    return {
+        "id": f"c{i}",
+        "name": f"Category {i}",
+        "weblink": f"https://www.speedrun.com/game#Category_{i}",
+        "type": "per-game",
+        "rules": "Timing starts on the first frame of input. " * 10,
+        "players": {"type": "exactly", "value": 1},
+        "miscellaneous": False,
+        "links": [],
+        "variables": {"data": [variable(i)]},
+    }
+
+
+def run(i: int) -> dict:
+    return {
+        "id": f"r{i}",
+        "weblink": f"https://www.speedrun.com/game/run/r{i}",
+        "game": "g1",
+        "level": None,
+        "category": {"data": category(i % 4)},
+        "videos": {"links": [{"uri": f"https://www.youtube.com/watch?v={i}"}]},
+        "comment": "Good run",
+        "status": {
+            "status": "verified",
+            "examiner": "u1",
+            "verify-date": "2021-01-01T00:00:00Z",
+        },
+        "players": {"data": [user(i % 100)]},
+        "date": "2020-05-05",
+        "submitted": "2020-05-05T12:00:00Z",
+        "times": {
+            "primary": "PT1M40S",
+            "primary_t": 100 + i,
+            "realtime": "PT1M40S",
+            "realtime_t": 100 + i,
+            "realtime_noloads": None,
+            "realtime_noloads_t": 0,
+            "ingame": None,
+            "ingame_t": 0,
+        },
+        "system": {"platform": "p1", "emulated": False, "region": None},
+        "splits": None,
+        "values": {f"v{i % 4}": f"v{i % 4}A"},
+        "links": [],
+    }
+
+
+def game(i: int) -> dict:
+    return {
+        "id": f"g{i}",
+        "names": {"international": f"Game {i}", "japanese": None, "twitch": None},
+        "boostReceived": 0,
+        "boostDistinctDonors": 0,
+        "abbreviation": f"game{i}",
+        "weblink": f"https://www.speedrun.com/game{i}",
+        "released": 2011,
+        "release-date": "2011-10-18",
+        "ruleset": {"show-milliseconds": True, "require-verification": True},
+        "romhack": False,
+        "gametypes": [],
+        "platforms": ["p1", "p2"],
+        "regions": ["r1"],
+        "genres": [],
+        "engines": [],
+        "developers": [],
+        "publishers": [],
+        "moderators": {"u1": "super-moderator"},
+        "created": "2015-01-01T00:00:00Z",
+        "categories": {"data": [category(c) for c in range(4)]},
+        "links": [],
+    }
+
+
+def baseline() -> Optional[ModuleType]:
+    """srctypes as it was in the first commit, plain classes with a __dict__
+    that decode everything up front and keep the whole payload"""
+    try:
+        root = subprocess.run(
+            ["git", "rev-list", "--max-parents=0", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.split()[-1]
+        source = subprocess.run(
+            ["git", "show", f"{root}:srcomapipy/srctypes.py"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError, IndexError):
+        return None
+    module = ModuleType("srctypes_before")
+    exec(compile(source, "srctypes_before.py", "exec"), module.__dict__)
+    return module
+
+
+def measure(build, make) -> int:
+    """Bytes per object kept alive after the parsed payloads are dropped"""
+    raw = json.dumps([make(i) for i in range(N)])
+    gc.collect()
+    tracemalloc.start()
+    payloads = json.loads(raw)
+    objects = [build(p) for p in payloads]
+    # touch the lazily decoded attributes like a typical caller would
+    for obj in objects:
+        getattr(obj, "times", None)
+        getattr(obj, "categories", None)
+    del payloads
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return retained // N
+
+
+def payload(make) -> int:
+    raw = json.dumps([make(i) for i in range(N)])
+    gc.collect()
+    tracemalloc.start()
+    payloads = json.loads(raw)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del payloads
+    return size // N
+
+
+def main():
+    print(f"memory per object, {N} objects each")
+    before = baseline()
+    if before is None:
+        print("baseline unavailable, run from a git checkout of the repository")
+    for name, cls, make in (
+        ("Run", Run, run),
+        ("Game", Game, game),
+        ("Category", Category, category),
+    ):
+        print(f"{name}: parsed payload {payload(make)} B")
+        if before is not None:
+            size = measure(getattr(before, name), make)
+            print(f"  {'before __slots__':32} {size:6} B")
+        for keep_data in (True, False):
+            for shared in (False, True):
+                registry = Registry() if shared else None
+                size = measure(
+                    lambda d: cls(d, keep_data=keep_data, registry=registry), make
+                )
+                label = f"keep_data={keep_data}, registry={'yes' if shared else 'no'}"
+                print(f"  {label:32} {size:6} B")
+
+
+if __name__ == "__main__":
+    main()
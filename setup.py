@@ -19,5 +19,10 @@ setup(
         "Operating System :: OS Independent",
     ],
     install_requires=["requests >= 2.23.3"],
+    extras_require={
+        "async": ["aiohttp >= 3.8"],
+        "fast": ["orjson >= 3.6"],
+        "numpy": ["numpy >= 1.22"],
+    },
     python_requires=">=3.10",
 )
@@ -0,0 +1,463 @@
+import time
+import asyncio
+from typing import Optional, Any, Generator, AsyncIterator, Callable, Literal
+from .srcomapipy import SRC, API_URL, THROTTLED, STREAM_CHUNK, _Call
+from .srctypes import *
+from .cache import Cache, strip_embeds, freeze
+from .store import EntityStore
+from .table import RunTable
+from .stream import StreamParser
+from .projection import Projection
+from .watch import QueueWatcher, QueueEvent, NotificationCursor
+from .ratelimit import RateLimiter, retry_delay
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class AsyncSRC(SRC):
+    """asyncio version of SRC, every endpoint method has the same arguments
+    as its SRC counterpart but returns a coroutine, iter_* methods return
+    async iterators. Requires aiohttp"""
+
+    def __init__(
+        self,
+        api_key: str = "",
+        user_agent: str = "Green-Bat/srcomapipy",
+        session: Optional["aiohttp.ClientSession"] = None,
+        pool_size: int = 10,
+        timeout: float | tuple[float, float] = (5, 30),
+        cache: Optional[Cache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_retries: int = 5,
+        hedge_after: Optional[float] = None,
+        keep_data: bool = True,
+        store: Optional[EntityStore] = None,
+        json_loads: Optional[Callable[[bytes], Any]] = None,
+        projection: Optional[Projection] = None,
+    ):
+        """
+        Args:
+            api_key: speedrun.com API key, required for authenticated endpoints
+            user_agent: sent with every request to identify the client
+            session: an existing aiohttp session to send requests through,
+                it will not be closed by close(). Created on first use if omitted
+            pool_size: maximum number of simultaneous connections
+            timeout: seconds to wait for a response, either a single number
+                or a (connect, read) tuple
+            cache: where responses of GET requests are cached
+            rate_limiter: limits the rate of all requests
+            max_retries: how often a throttled or failed request is retried
+            hedge_after: if a GET request takes longer than this many seconds
+                after it was sent, a duplicate is sent if the rate limiter has
+                a token to spare and whichever responds first is used
+            keep_data: determines if returned objects keep the raw response
+            store: where entities found in responses are kept to answer
+                single entity getters without a request
+            json_loads: parses response bodies, orjson is used if installed
+            projection: fields of responses that are kept, e.g. SLIM
+        """
+        if aiohttp is None:
+            raise SRCException("AsyncSRC requires aiohttp, pip install aiohttp")
+        self.pool_size = pool_size
+        super().__init__(
+            api_key,
+            user_agent,
+            session,
+            pool_size,
+            timeout,
+            cache,
+            rate_limiter,
+            max_retries,
+            hedge_after,
+            keep_data,
+            store,
+            json_loads,
+            projection,
+        )
+        self._in_flight_tasks: dict[tuple, asyncio.Future] = {}
+
+    def _create_session(self, pool_size: int) -> None:
+        # aiohttp sessions have to be created inside the running event loop
+        return None
+
+    def _client_session(self) -> "aiohttp.ClientSession":
+        if self.session is None:
+            if isinstance(self.timeout, tuple):
+                connect, read = self.timeout
+                timeout = aiohttp.ClientTimeout(sock_connect=connect, sock_read=read)
+            else:
+                timeout = aiohttp.ClientTimeout(total=self.timeout)
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                timeout=timeout,
+            )
+        return self.session
+
+    async def close(self):
+        """Closes the underlying session if it was created by this client"""
+        if self._owns_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def __aenter__(self) -> "AsyncSRC":
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def _drive(self, steps: Generator[_Call, Any, Any]) -> Any:
+        try:
+            call = next(steps)
+            while True:
+                call = steps.send(await self._perform(call))
+        except StopIteration as done:
+            return done.value
+
+    async def _request(
+        self, method: str, uri: str, exc: type = SRCAPIException, **kwargs
+    ) -> dict:
+        if kwargs.get("params"):
+            kwargs["params"] = self._query(kwargs["params"])
+        idempotent = method == "GET"
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            await asyncio.sleep(self.rate_limiter.reserve())
+            try:
+                if idempotent and self.hedge_after:
+                    status, headers, raw = await self._send_hedged(uri, **kwargs)
+                else:
+                    status, headers, raw = await self._send(method, uri, **kwargs)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if not idempotent or last_attempt:
+                    self.metrics.count("errors")
+                    raise
+                self.metrics.count("retries")
+                await asyncio.sleep(retry_delay(attempt))
+                continue
+            if status in THROTTLED and not last_attempt:
+                self.metrics.count("throttled")
+                self.rate_limiter.penalize(
+                    retry_delay(attempt, headers.get("Retry-After"))
+                )
+            elif status >= 500 and idempotent and not last_attempt:
+                self.metrics.count("retries")
+                await asyncio.sleep(retry_delay(attempt))
+            else:
+                break
+        body = self.json_loads(raw)
+        if status >= 400:
+            self.metrics.count("errors")
+            raise exc(status, uri[len(API_URL) :], body)
+        return body
+
+    def _query(self, params: dict) -> dict:
+        # aiohttp only accepts strings and numbers as query values
+        return {
+            k: str(v) if isinstance(v, bool) else v
+            for k, v in params.items()
+            if v is not None
+        }
+
+    async def _send(self, method: str, uri: str, **kwargs) -> tuple[int, dict, bytes]:
+        start = time.perf_counter()
+        try:
+            async with self._client_session().request(
+                method, uri, headers=self.headers, **kwargs
+            ) as r:
+                raw = await r.read()
+        except asyncio.TimeoutError:
+            self.metrics.count("timeouts")
+            raise
+        self.metrics.observe(time.perf_counter() - start)
+        return r.status, r.headers, raw
+
+    async def _send_hedged(self, uri: str, **kwargs) -> tuple[int, dict, bytes]:
+        first = asyncio.ensure_future(self._send("GET", uri, **kwargs))
+        # the timer starts once the request got its token, and a request is
+        # only hedged if there's a token to spare
+        done, _ = await asyncio.wait([first], timeout=self.hedge_after)
+        if done or not self.rate_limiter.try_acquire():
+            return await first
+        self.metrics.count("hedged")
+        hedge = asyncio.ensure_future(self._send("GET", uri, **kwargs))
+        pending = {first, hedge}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for f in done:
+                    if f.exception() is None:
+                        if f is hedge:
+                            self.metrics.count("hedge_wins")
+                        return f.result()
+            return first.result()
+        finally:
+            for f in pending:
+                f.cancel()
+
+    async def post(self, uri: str, json: dict) -> dict:
+        body = await self._request("POST", API_URL + uri, SRCRunException, json=json)
+        self._written(uri)
+        return body["data"]
+
+    async def put(self, uri: str, json: dict) -> dict:
+        body = await self._request("PUT", API_URL + uri, json=json)
+        self._written(uri)
+        return body["data"]
+
+    async def delete(self, uri: str) -> dict:
+        body = await self._request("DELETE", API_URL + uri)
+        self._written(uri)
+        return body["data"]
+
+    async def _pages(
+        self,
+        uri: str,
+        params: dict,
+        prefetch: bool = False,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[dict | list[dict]]:
+        body = await self._request("GET", uri, params=params)
+        task: Optional[asyncio.Task] = None
+        try:
+            while True:
+                data, limit, next_link = self._take(body, limit)
+                data = self._project(uri, data)
+                if next_link and prefetch:
+                    task = asyncio.ensure_future(self._request("GET", next_link))
+                yield data
+                if not next_link:
+                    return
+                if task:
+                    body = await task
+                else:
+                    body = await self._request("GET", next_link)
+        finally:
+            if task and not task.done():
+                task.cancel()
+
+    async def get(
+        self,
+        uri: str,
+        params: dict = None,
+        bulk: bool = False,
+        limit: Optional[int] = None,
+    ) -> Optional[dict | list[dict]]:
+        uri, params, key = self._prepare_get(uri, params, bulk, limit)
+        data: dict | list[dict] = self.cache.get_embedded(key)
+        if data is not None:
+            return data
+        wide_key = self.cache.widen(key)
+        if wide_key is key:
+            return await self._fetch(uri, params, limit, key)
+        params = dict(params, embed=dict(wide_key[1])["embed"])
+        data = await self._fetch(uri, params, limit, wide_key)
+        return strip_embeds(data, wide_key, key) if data is not None else None
+
+    async def _fetch(
+        self, uri: str, params: dict, limit: Optional[int], key: tuple
+    ) -> Optional[dict | list[dict]]:
+        flight = self._in_flight_tasks.get(key)
+        if flight is None:
+            flight = asyncio.ensure_future(self._get_pages(uri, params, limit, key))
+            self._in_flight_tasks[key] = flight
+            flight.add_done_callback(lambda _: self._in_flight_tasks.pop(key, None))
+        # shielded so one cancelled caller doesn't cancel the request for the others
+        return await asyncio.shield(flight)
+
+    async def _get_pages(
+        self, uri: str, params: dict, limit: Optional[int], key: tuple
+    ) -> Optional[dict | list[dict]]:
+        data = None
+        async for page in self._pages(uri, params, limit=limit):
+            if data is None:
+                data = page
+            else:
+                data.extend(page)
+        data = freeze(data)
+        self.cache.set(key, data, self.cache.ttl_for(key[0], params))
+        self._store(key, params, data)
+        return data
+
+    async def iter_pages(
+        self,
+        uri: str,
+        params: dict = None,
+        bulk: bool = False,
+        prefetch: bool = False,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[dict | list[dict]]:
+        uri, params, key = self._prepare_get(uri, params, bulk, limit)
+        data: dict | list[dict] = self.cache.get_embedded(key)
+        if data is not None:
+            yield data
+            return
+        async for page in self._pages(uri, params, prefetch, limit):
+            self._store(key, params, page)
+            yield page
+
+    async def iter_stream(
+        self,
+        uri: str,
+        params: dict = None,
+        bulk: bool = False,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[dict]:
+        uri, params, key = self._prepare_get(uri, params, bulk, limit)
+        data: dict | list[dict] = self.cache.get_embedded(key)
+        if isinstance(data, dict):
+            raise ValueError("data of the response is not a list of items")
+        if data is not None:
+            for item in data:
+                yield item
+            return
+        while uri:
+            parser = StreamParser()
+            await asyncio.sleep(self.rate_limiter.reserve())
+            start = time.perf_counter()
+            async with self._client_session().get(
+                uri, params=self._query(params or {}), headers=self.headers
+            ) as r:
+                self.metrics.observe(time.perf_counter() - start)
+                if r.status == 200:
+                    async for chunk in r.content.iter_chunked(STREAM_CHUNK):
+                        for item in parser.feed(chunk):
+                            yield self._project(uri, item)
+                            if limit is not None:
+                                limit -= 1
+                                if limit <= 0:
+                                    return
+                    parser.close()
+            body = parser.fields
+            if r.status != 200:
+                # throttled and failed requests are retried the regular way
+                body = await self._request("GET", uri, params=params)
+                data, limit, _ = self._take(body, limit)
+                if isinstance(data, dict):
+                    raise ValueError("data of the response is not a list of items")
+                for item in self._project(uri, data):
+                    yield item
+                if limit is not None and limit <= 0:
+                    return
+            uri, params = self._next_page(body), None
+
+    async def _iter_items(
+        self,
+        call: _Call,
+        parse: Callable[[dict], Any],
+        prefetch: bool,
+        stream: bool = False,
+    ) -> AsyncIterator[Any]:
+        if stream:
+            items = self.iter_stream(call.uri, call.params, call.bulk, call.limit)
+            async for item in items:
+                yield parse(item)
+            return
+        pages = self.iter_pages(call.uri, call.params, call.bulk, prefetch, call.limit)
+        async for page in pages:
+            for item in page:
+                yield parse(item)
+
+    async def get_run_table(self, prefetch: bool = False, **filters) -> RunTable:
+        call = self._first_call(SRC.get_runs, **filters)
+        params = {k: v for k, v in call.params.items() if k != "embed"}
+        table = RunTable()
+        pages = self.iter_pages(call.uri, params, call.bulk, prefetch, call.limit)
+        async for page in pages:
+            table.extend(page)
+        return table
+
+    async def crawl_leaderboards(
+        self,
+        game: Game,
+        top: Optional[int] = None,
+        scope: Literal["full-game", "levels", "all"] = "all",
+        max_workers: int = 8,
+        **board_args,
+    ) -> AsyncIterator[Leaderboard]:
+        if not hasattr(game, "categories_by_id") or not hasattr(game, "levels_by_id"):
+            game = await self.get_game(game.id)
+        specs = self._leaderboard_specs(game, scope)
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def fetch(category, level, variables) -> Leaderboard:
+            async with semaphore:
+                return await self.get_leaderboard(
+                    game, category, level, top=top, variables=variables, **board_args
+                )
+
+        tasks = [asyncio.ensure_future(fetch(*spec)) for spec in specs]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def get_new_notifications(
+        self, cursor: NotificationCursor, page_size: int = 20
+    ) -> list[Notification]:
+        if not self.api_key:
+            raise SRCException("An API Key is required to get notifications")
+        new = []
+        async for page in self._pages(*self._feed_request(cursor, page_size)):
+            fresh = [n for n in page if cursor.is_new(n)]
+            new += fresh
+            if len(fresh) < len(page):
+                break
+        cursor.advance(new)
+        return [Notification(n) for n in new]
+
+    async def _poll_queue(self, game_id: str) -> list[Run]:
+        params = {"game": game_id, "status": "new", "orderby": "submitted"}
+        uri, params, _ = self._prepare_get("runs", params, False)
+        return [
+            Run(r, keep_data=self.keep_data, registry=self.registry)
+            async for page in self._pages(uri, params)
+            for r in page
+        ]
+
+    async def watch_queue(
+        self,
+        game_ids: list[str],
+        interval: float = 30,
+        min_interval: float = 5,
+        max_interval: float = 300,
+        initial: bool = False,
+        max_workers: int = 8,
+    ) -> AsyncIterator[QueueEvent]:
+        """Polls the verification queues of games and yields a QueueEvent for
+        each run that is submitted or leaves a queue and an "error" event for
+        each poll that failed, see SRC.watch_queue"""
+        watcher = QueueWatcher(game_ids, interval, min_interval, max_interval, initial)
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def poll(game_id: str) -> tuple[str, list[Run] | Exception]:
+            async with semaphore:
+                try:
+                    return game_id, await self._poll_queue(game_id)
+                except Exception as e:
+                    # one failing game doesn't stop the others
+                    return game_id, e
+
+        while True:
+            due = watcher.due(time.monotonic())
+            if not due:
+                await asyncio.sleep(watcher.wait(time.monotonic()))
+                continue
+            tasks = [asyncio.ensure_future(poll(game_id)) for game_id in due]
+            try:
+                for task in asyncio.as_completed(tasks):
+                    game_id, runs = await task
+                    if isinstance(runs, Exception):
+                        yield watcher.fail(game_id, runs, time.monotonic())
+                        continue
+                    for event in watcher.update(game_id, runs, time.monotonic()):
+                        yield event
+            finally:
+                for task in tasks:
+                    task.cancel()
@@ -0,0 +1,489 @@
+import json
+import time
+import zlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Optional, Any
+from urllib.parse import parse_qsl
+from .store import _parse_embeds
+from . import jsonlib
+
+# seconds a response stays fresh, keys are an endpoint or a kind of response
+# (see _kind) optionally followed by query parameters that have to match
+# e.g. "runs?status=new", so "leaderboards" also covers games/{id}/records
+DEFAULT_TTLS: dict[str, Optional[float]] = {
+    "platforms": 86400,
+    "regions": 86400,
+    "developers": 86400,
+    "publishers": 86400,
+    "genres": 86400,
+    "gametypes": 86400,
+    "engines": 86400,
+    "leaderboards": 600,
+    "runs": 600,
+    "runs?status=new": 15,
+    "personal-bests": 600,
+    "notifications": 30,
+    "profile": 300,
+}
+
+# kinds of responses that change when something is written to an endpoint,
+# runs also show up in leaderboards, records and personal bests
+DEPENDENT: dict[str, tuple[str, ...]] = {
+    "runs": ("runs", "leaderboards", "personal-bests"),
+}
+
+# embeds that are replaced by the ID(s) of the resource instead of being left
+# out when they aren't requested, by kind of response
+REFERENCED: dict[str, set[str]] = {
+    "games": {
+        "platforms",
+        "regions",
+        "gametypes",
+        "genres",
+        "engines",
+        "developers",
+        "publishers",
+    },
+    "runs": {"game", "category", "level", "players"},
+    "leaderboards": {"game", "category", "level"},
+}
+# embeds whose un-embedded form can't be restored, they're left embedded
+KEPT = {"moderators"}
+
+
+def _readonly(self, *args, **kwargs):
+    raise TypeError("cached responses can't be modified, make a copy first")
+
+
+class FrozenDict(dict):
+    """dict of a cached response, it's shared by every request it's returned to
+    so every method that would modify it raises TypeError"""
+
+    __slots__ = ()
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __reduce__(self):
+        return FrozenDict, (dict(self),)
+
+
+class FrozenList(list):
+    """list of a cached response, see FrozenDict"""
+
+    __slots__ = ()
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly
+    append = extend = insert = pop = remove = clear = sort = reverse = _readonly
+
+    def __reduce__(self):
+        return FrozenList, (list(self),)
+
+
+def freeze(value: Any) -> Any:
+    """Returns a read only copy of a parsed response, frozen parts are reused"""
+    if type(value) is dict:
+        return FrozenDict((k, freeze(v)) for k, v in value.items())
+    if type(value) is list:
+        return FrozenList(freeze(v) for v in value)
+    return value
+
+
+def _kind(uri: str) -> str:
+    parts = uri.split("/")
+    if parts[0] == "leaderboards" or parts[-1] == "records":
+        return "leaderboards"
+    if parts[-1] in ("games", "derived-games"):
+        return "games"
+    if len(parts) <= 2:
+        return parts[0]
+    return parts[-1]
+
+
+def _split_embed(key: tuple) -> tuple[tuple, set[str]]:
+    """Returns the key without its embed parameter and the set of embeds"""
+    params = tuple(p for p in key[1] if p[0] != "embed")
+    embed = next((v for k, v in key[1] if k == "embed"), "")
+    return (key[0], params, *key[2:]), set(filter(None, embed.split(",")))
+
+
+def _with_embed(key: tuple, embeds: set[str]) -> tuple:
+    base, _ = _split_embed(key)
+    params = base[1] + (("embed", ",".join(sorted(embeds))),) if embeds else base[1]
+    return (key[0], tuple(sorted(params)), *key[2:])
+
+
+def _covers(embeds: set[str], wanted: set[str]) -> bool:
+    """Checks if a response with embeds has everything a request for wanted has,
+    e.g. category.variables also covers category"""
+    return all(
+        e in embeds or any(c.startswith(e + ".") for c in embeds) for e in wanted
+    )
+
+
+def _reference(key: str, value: dict | list[dict]) -> Any:
+    """Returns the un-embedded form of an embedded resource"""
+    if key == "players":
+        return [
+            (
+                {"rel": "guest", "name": p["name"]}
+                if p.get("rel") == "guest"
+                else {"rel": "user", "id": p["id"]}
+            )
+            for p in value
+        ]
+    if isinstance(value, list):
+        return [v["id"] for v in value] if key.endswith("s") else None
+    return value["id"]
+
+
+def _strip(item: dict, embeds: dict, wanted: dict, referenced: set[str]) -> dict:
+    item = dict(item)
+    for key, sub_embeds in embeds.items():
+        embedded = item.get(key)
+        if not isinstance(embedded, dict) or "data" not in embedded:
+            continue
+        if key in wanted:
+            if sub_embeds == wanted[key]:
+                continue
+            # nested embeds are always left out when they aren't requested
+            value = embedded["data"]
+            if isinstance(value, list):
+                value = [_strip(v, sub_embeds, wanted[key], set()) for v in value]
+            elif value:
+                value = _strip(value, sub_embeds, wanted[key], set())
+            item[key] = {"data": value}
+        elif key in referenced:
+            item[key] = _reference(key, embedded["data"])
+        elif key not in KEPT:
+            del item[key]
+    return item
+
+
+def strip_embeds(data: Any, cached_key: tuple, key: tuple) -> Any:
+    """Turns a cached response into the response of a request
+    with fewer embeds, without modifying the cached response"""
+    _, embeds = _split_embed(cached_key)
+    _, wanted = _split_embed(key)
+    if embeds == wanted:
+        return data
+    embeds = _parse_embeds(",".join(embeds))
+    wanted = _parse_embeds(",".join(wanted))
+    referenced = REFERENCED.get(_kind(key[0]), set())
+    if isinstance(data, list):
+        return [_strip(d, embeds, wanted, referenced) for d in data]
+    return _strip(data, embeds, wanted, referenced)
+
+
+class Cache:
+    """Base class for response caches. Subclasses implement get, set, invalidate
+    and clear, keys are tuples whose first item is the uri relative to the API url
+    Args:
+        ttls: time to live in seconds per endpoint, see DEFAULT_TTLS
+        default_ttl: time to live of endpoints not in ttls, None never expires
+        upgrade_embeds: requests are sent with every embed cached for the same
+            request so the response can serve all of them
+    """
+
+    def __init__(
+        self,
+        ttls: Optional[dict[str, Optional[float]]] = None,
+        default_ttl: Optional[float] = None,
+        upgrade_embeds: bool = False,
+    ):
+        self.default_ttl = default_ttl
+        self.upgrade_embeds = upgrade_embeds
+        self.ttls: list[tuple[str, dict[str, str], Optional[float]]] = []
+        for rule, ttl in (DEFAULT_TTLS if ttls is None else ttls).items():
+            path, _, query = rule.partition("?")
+            self.ttls.append((path, dict(parse_qsl(query)), ttl))
+        # most specific rules are checked first
+        self.ttls.sort(key=lambda r: (len(r[0]), len(r[1])), reverse=True)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def ttl_for(self, uri: str, params: Optional[dict] = None) -> Optional[float]:
+        """Returns the time to live of a response from this uri and parameters"""
+        params = params or {}
+        kind = _kind(uri.split("?")[0])
+        for path, conditions, ttl in self.ttls:
+            if (uri.startswith(path) or kind == path) and all(
+                str(params.get(k)) == v for k, v in conditions.items()
+            ):
+                return ttl
+        return self.default_ttl
+
+    def get(self, key: tuple) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: tuple, value: Any, ttl: Optional[float] = None):
+        raise NotImplementedError
+
+    def invalidate(self, prefix: str = "") -> int:
+        """Removes every entry whose uri starts with prefix,
+        returns the number of removed entries"""
+        raise NotImplementedError
+
+    def invalidate_kinds(self, kinds: tuple[str, ...]) -> int:
+        """Removes every entry whose kind of response (see _kind) is one of
+        kinds, returns the number of removed entries. Everything is removed
+        unless a subclass overrides this"""
+        return self.invalidate()
+
+    def keys(self, uri: str) -> list[tuple]:
+        """Returns the keys of every entry of a uri, expired ones included"""
+        raise NotImplementedError
+
+    def _variants(self, key: tuple) -> list[tuple]:
+        # keys of the same request with different embeds
+        base, _ = _split_embed(key)
+        variants = []
+        for k in self.keys(key[0]):
+            other, embeds = _split_embed(k)
+            if other == base:
+                variants.append((k, embeds))
+        return variants
+
+    def get_embedded(self, key: tuple) -> Optional[Any]:
+        """Like get, but if the request isn't cached and the same request with
+        more embeds is, that response is returned without the extra embeds"""
+        data = self.get(key)
+        if data is not None:
+            return data
+        _, wanted = _split_embed(key)
+        # the response with the fewest extra embeds needs the least stripping
+        variants = sorted(self._variants(key), key=lambda v: len(v[1]))
+        for cached_key, embeds in variants:
+            if cached_key != key and _covers(embeds, wanted):
+                data = self.get(cached_key)
+                if data is not None:
+                    return strip_embeds(data, cached_key, key)
+        return None
+
+    def widen(self, key: tuple) -> tuple:
+        """Returns the key of the request with every embed cached for it added,
+        or key itself if upgrade_embeds is off or there's nothing to add"""
+        if not self.upgrade_embeds:
+            return key
+        _, wanted = _split_embed(key)
+        embeds = wanted.union(*[e for _, e in self._variants(key)])
+        if _covers(wanted, embeds):
+            return key
+        return _with_embed(key, embeds)
+
+    def clear(self):
+        self.invalidate()
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+class MemoryCache(Cache):
+    """In memory cache with LRU eviction
+    Args:
+        max_entries: maximum number of responses kept
+        max_bytes: maximum approximate size of all responses kept,
+            measured as the length of their JSON encoding
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = 1024,
+        max_bytes: Optional[int] = None,
+        ttls: Optional[dict[str, Optional[float]]] = None,
+        default_ttl: Optional[float] = None,
+        upgrade_embeds: bool = False,
+    ):
+        super().__init__(ttls, default_ttl, upgrade_embeds)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: OrderedDict[tuple, tuple[Any, Optional[float], int]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: tuple) -> bool:
+        return self.get(key) is not None
+
+    def get(self, key: tuple) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires, size = entry
+            if expires is not None and expires <= time.monotonic():
+                del self._entries[key]
+                self.size -= size
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: tuple, value: Any, ttl: Optional[float] = None):
+        if ttl is not None and ttl <= 0:
+            return
+        size = len(jsonlib.dumps(value)) if self.max_bytes else 0
+        if self.max_bytes and size > self.max_bytes:
+            return
+        expires = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            if key in self._entries:
+                self.size -= self._entries.pop(key)[2]
+            self._entries[key] = (value, expires, size)
+            self.size += size
+            while (self.max_entries is not None and len(self) > self.max_entries) or (
+                self.max_bytes and self.size > self.max_bytes
+            ):
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self.size -= evicted
+                self.evictions += 1
+
+    def invalidate(self, prefix: str = "") -> int:
+        with self._lock:
+            keys = [k for k in self._entries if k[0].startswith(prefix)]
+            for k in keys:
+                self.size -= self._entries.pop(k)[2]
+            return len(keys)
+
+    def invalidate_kinds(self, kinds: tuple[str, ...]) -> int:
+        with self._lock:
+            keys = [k for k in self._entries if _kind(k[0]) in kinds]
+            for k in keys:
+                self.size -= self._entries.pop(k)[2]
+            return len(keys)
+
+    def keys(self, uri: str) -> list[tuple]:
+        with self._lock:
+            return [k for k in self._entries if k[0] == uri]
+
+
+class SQLiteCache(Cache):
+    """Persistent cache stored in an SQLite file, responses are kept as
+    compressed JSON and survive restarts. Several processes on the same
+    host can share one file
+    Args:
+        path: location of the database file
+        compression: zlib compression level from 0 (none) to 9
+    """
+
+    def __init__(
+        self,
+        path: str = "srcomapipy_cache.sqlite3",
+        ttls: Optional[dict[str, Optional[float]]] = None,
+        default_ttl: Optional[float] = None,
+        compression: int = 6,
+        upgrade_embeds: bool = False,
+    ):
+        super().__init__(ttls, default_ttl, upgrade_embeds)
+        self.path = path
+        self.compression = compression
+        self._local = threading.local()
+        # connections of every thread, so close can close all of them
+        self._connections: set[sqlite3.Connection] = set()
+        self._lock = threading.Lock()
+        with self._connection() as con:
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, uri TEXT, data BLOB, expires REAL)"
+            )
+            con.execute("CREATE INDEX IF NOT EXISTS responses_uri ON responses(uri)")
+
+    def _connection(self) -> sqlite3.Connection:
+        # each thread uses its own connection, only close touches the others
+        con: Optional[sqlite3.Connection] = getattr(self._local, "con", None)
+        if con is None or con not in self._connections:
+            con = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            self._local.con = con
+            with self._lock:
+                self._connections.add(con)
+        return con
+
+    def _key(self, key: tuple) -> str:
+        return json.dumps(key, separators=(",", ":"), default=str)
+
+    def __len__(self) -> int:
+        return (
+            self._connection().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        )
+
+    def get(self, key: tuple) -> Optional[Any]:
+        row = (
+            self._connection()
+            .execute(
+                "SELECT data, expires FROM responses WHERE key = ?", (self._key(key),)
+            )
+            .fetchone()
+        )
+        hit = row is not None and (row[1] is None or row[1] > time.time())
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return jsonlib.loads(zlib.decompress(row[0])) if hit else None
+
+    def set(self, key: tuple, value: Any, ttl: Optional[float] = None):
+        if ttl is not None and ttl <= 0:
+            return
+        data = zlib.compress(jsonlib.dumps(value), self.compression)
+        expires = time.time() + ttl if ttl is not None else None
+        with self._connection() as con:
+            con.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                (self._key(key), key[0], data, expires),
+            )
+
+    def invalidate(self, prefix: str = "") -> int:
+        with self._connection() as con:
+            cur = con.execute(
+                "DELETE FROM responses WHERE substr(uri, 1, ?) = ?",
+                (len(prefix), prefix),
+            )
+        return cur.rowcount
+
+    def invalidate_kinds(self, kinds: tuple[str, ...]) -> int:
+        con = self._connection()
+        uris = [u for (u,) in con.execute("SELECT DISTINCT uri FROM responses")]
+        uris = [(u,) for u in uris if _kind(u) in kinds]
+        with con:
+            cur = con.executemany("DELETE FROM responses WHERE uri = ?", uris)
+        return cur.rowcount
+
+    def keys(self, uri: str) -> list[tuple]:
+        rows = (
+            self._connection()
+            .execute("SELECT key FROM responses WHERE uri = ?", (uri,))
+            .fetchall()
+        )
+        keys = []
+        for (key,) in rows:
+            uri, params, *rest = json.loads(key)
+            keys.append((uri, tuple(tuple(p) for p in params), *rest))
+        return keys
+
+    def purge(self) -> int:
+        """Removes expired responses from the file, returns the number removed"""
+        with self._connection() as con:
+            cur = con.execute(
+                "DELETE FROM responses WHERE expires <= ?", (time.time(),)
+            )
+        with self._lock:
+            self.evictions += cur.rowcount
+        return cur.rowcount
+
+    def close(self):
+        """Closes the connections of every thread, a thread that uses the
+        cache afterwards opens a new one"""
+        with self._lock:
+            connections, self._connections = self._connections, set()
+        for con in connections:
+            con.close()
@@ -0,0 +1,219 @@
+import os
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left
+from heapq import nlargest
+from collections import Counter
+from typing import Optional, Iterable
+from .srcomapipy import SRC
+from .srctypes import Game
+from . import jsonlib
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def _normalize(text: str) -> str:
+    """Case folded text without accents and punctuation
+    e.g. "Pokémon: Red" -> "pokemon red"
+    """
+    chars: list[str] = []
+    for c in unicodedata.normalize("NFKD", text.casefold()):
+        # accents of latin letters are dropped, marks of other scripts are kept
+        if unicodedata.combining(c) and chars and chars[-1] < "\u0250":
+            continue
+        chars.append(c)
+    text = unicodedata.normalize("NFC", "".join(chars))
+    return " ".join(_NON_WORD.sub(" ", text).split())
+
+
+def _trigrams(text: str) -> set[str]:
+    text = f" {text} "
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+class GameIndex:
+    """Local index of the whole game catalog for looking up games without
+    a request. The catalog is downloaded once in bulk mode and later updates
+    only download the games created since. Lookups return bulk Games which
+    only have an ID, names, abbreviation and weblink
+    Args:
+        api: client the catalog is downloaded through
+        path: file the index is saved to and loaded from if it exists
+    """
+
+    def __init__(self, api: SRC, path: Optional[str] = None):
+        self.api = api
+        self.path = path
+        # (id, international, japanese, twitch, abbreviation, weblink) per row
+        self._games: list[tuple[Optional[str], ...]] = []
+        self._rows: dict[str, int] = {}
+        self._abbreviations: dict[str, int] = {}
+        self._names: dict[str, list[int]] = {}
+        # normalized names and abbreviations sorted for prefix search
+        self._sorted: list[tuple[str, int]] = []
+        self._unsorted = False
+        self._grams: dict[str, array] = {}
+        self._gram_counts = array("H")
+        if path and os.path.exists(path):
+            with open(path, "rb") as f:
+                self._extend(tuple(g) for g in jsonlib.loads(f.read()))
+
+    def __len__(self) -> int:
+        return len(self._games)
+
+    def __contains__(self, game_id: str) -> bool:
+        return game_id in self._rows
+
+    # --building--
+    def _extend(self, games: Iterable[tuple[Optional[str], ...]]):
+        rebuild = False
+        for game in games:
+            row = self._rows.get(game[0])
+            if row is None:
+                self._rows[game[0]] = len(self._games)
+                self._games.append(game)
+                self._index(len(self._games) - 1)
+            elif self._games[row] != game:
+                # renamed games are rare, every index is rebuilt for them
+                self._games[row] = game
+                rebuild = True
+        if rebuild:
+            self._reindex()
+
+    def _index(self, row: int):
+        _, *names, abv, _ = self._games[row]
+        if abv:
+            self._abbreviations[abv.casefold()] = row
+            self._sorted.append((abv.casefold(), row))
+        grams: set[str] = set()
+        for name in set(_normalize(n) for n in names if n):
+            self._names.setdefault(name, []).append(row)
+            self._sorted.append((name, row))
+            grams |= _trigrams(name)
+        for gram in grams:
+            posting = self._grams.get(gram)
+            if posting is None:
+                posting = self._grams[gram] = array("i")
+            posting.append(row)
+        self._gram_counts.append(min(len(grams), 0xFFFF))
+        self._unsorted = True
+
+    def _reindex(self):
+        self._abbreviations.clear()
+        self._names.clear()
+        self._sorted.clear()
+        self._grams.clear()
+        self._gram_counts = array("H")
+        for row in range(len(self._games)):
+            self._index(row)
+
+    def update(self, full: bool = False) -> int:
+        """Downloads the games created since the last update, or the whole
+        catalog on the first update, returns the number of new games
+        Args:
+            full: downloads the whole catalog again to pick up renamed games
+        """
+        params = {"_bulk": True, "orderby": "created", "direction": "desc"}
+        uri, params, _ = self.api._prepare_get("games", params, True)
+        known = len(self)
+        incremental = known and not full
+        for page in self.api._pages(uri, params):
+            seen = any(g["id"] in self._rows for g in page)
+            self._extend(
+                (
+                    g["id"],
+                    g["names"]["international"],
+                    g["names"].get("japanese"),
+                    g["names"].get("twitch"),
+                    g["abbreviation"],
+                    g.get("weblink"),
+                )
+                for g in page
+            )
+            # games are newest first, so the rest of the catalog is known
+            if incremental and seen:
+                break
+        return len(self) - known
+
+    def save(self, path: Optional[str] = None):
+        """Writes the index to path, or the path it was created with"""
+        path = path or self.path
+        if not path:
+            raise ValueError("GameIndex.save needs a path")
+        with open(path, "wb") as f:
+            f.write(jsonlib.dumps(self._games))
+
+    # --lookups--
+    def _game(self, row: int) -> Game:
+        game_id, international, japanese, twitch, abv, weblink = self._games[row]
+        data = {
+            "id": game_id,
+            "names": {
+                "international": international,
+                "japanese": japanese,
+                "twitch": twitch,
+            },
+            "abbreviation": abv,
+            "weblink": weblink,
+        }
+        return Game(data, True, self.api.keep_data, self.api.registry)
+
+    def get(self, game_id: str) -> Optional[Game]:
+        row = self._rows.get(game_id)
+        return self._game(row) if row is not None else None
+
+    def by_abbreviation(self, abv: str) -> Optional[Game]:
+        """Returns the game with exactly this abbreviation, ignoring case"""
+        row = self._abbreviations.get(abv.casefold())
+        return self._game(row) if row is not None else None
+
+    def by_name(self, name: str) -> list[Game]:
+        """Returns the games whose name matches, ignoring case and punctuation"""
+        return [self._game(row) for row in self._names.get(_normalize(name), [])]
+
+    def prefix(self, text: str, limit: int = 10) -> list[Game]:
+        """Returns games whose name or abbreviation starts with text,
+        shortest first"""
+        if self._unsorted:
+            self._sorted.sort()
+            self._unsorted = False
+        text = _normalize(text)
+        matches: dict[int, int] = {}
+        i = bisect_left(self._sorted, (text, -1))
+        while i < len(self._sorted) and self._sorted[i][0].startswith(text):
+            key, row = self._sorted[i]
+            matches[row] = min(matches.get(row, len(key)), len(key))
+            i += 1
+        rows = sorted(matches, key=matches.__getitem__)[:limit]
+        return [self._game(row) for row in rows]
+
+    def search(self, text: str, limit: int = 10) -> list[Game]:
+        """Returns the games most similar to text, ranked by the share of
+        three letter sequences their names have in common with it, so typos
+        and missing words still match. An exact abbreviation comes first"""
+        query = _normalize(text)
+        grams = _trigrams(query)
+        counts: Counter[int] = Counter()
+        for gram in grams:
+            counts.update(self._grams.get(gram, ()))
+        counts_per_row = self._gram_counts
+        # games sharing less than half as much as the closest one are skipped
+        floor = max(counts.values(), default=0) / 2
+        scores = {
+            row: 2 * common / (len(grams) + counts_per_row[row])
+            for row, common in counts.items()
+            if common >= floor
+        }
+        exact = self._abbreviations.get(text.casefold())
+        if exact is not None:
+            scores[exact] = 2.0
+        for row in self._names.get(query, ()):
+            scores[row] = max(scores.get(row, 0), 1.5)
+        rows = nlargest(limit, scores, key=scores.__getitem__)
+        return [self._game(row) for row in rows]
+
+    def resolve(self, text: str) -> Optional[Game]:
+        """Returns the game meant by user input, an abbreviation or a name"""
+        games = self.search(text, 1)
+        return games[0] if games else None
@@ -0,0 +1,22 @@
+"""JSON backend used to parse responses and store cached ones,
+orjson is used when it's installed since it's several times faster"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    loads = orjson.loads
+
+    def dumps(value: Any) -> bytes:
+        return orjson.dumps(value)
+
+else:
+    loads = json.loads
+
+    def dumps(value: Any) -> bytes:
+        return json.dumps(value, separators=(",", ":")).encode()
@@ -0,0 +1,39 @@
+import threading
+from collections import Counter, deque
+from typing import Optional
+
+
+class Metrics:
+    """Thread safe request counters and a window of recent request latencies
+    Args:
+        samples: number of most recent latencies kept for percentiles
+    """
+
+    def __init__(self, samples: int = 1000):
+        self.counts: Counter[str] = Counter()
+        self.latencies: deque[float] = deque(maxlen=samples)
+        self._lock = threading.Lock()
+
+    def count(self, name: str, n: int = 1):
+        with self._lock:
+            self.counts[name] += n
+
+    def observe(self, seconds: float):
+        """Records the latency of a single request"""
+        with self._lock:
+            self.counts["requests"] += 1
+            self.latencies.append(seconds)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Returns the p-th percentile (0-100) of the recent latencies in seconds"""
+        with self._lock:
+            latencies = sorted(self.latencies)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p / 100))]
+
+    def snapshot(self) -> dict[str, float]:
+        stats = dict(self.counts)
+        stats["p50"] = self.percentile(50)
+        stats["p99"] = self.percentile(99)
+        return stats
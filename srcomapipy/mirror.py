@@ -0,0 +1,245 @@
+import sqlite3
+import threading
+from contextvars import copy_context
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional, Any, Iterable, Iterator, NamedTuple
+from .srcomapipy import SRC, API_URL
+from .srctypes import Run, SRCAPIException
+from .table import RunTable
+from . import jsonlib
+
+
+class RunDelta(NamedTuple):
+    """Changes to the runs of a game found by a sync"""
+
+    game_id: str
+    added: list[Run]
+    verified: list[Run]
+    rejected: list[Run]
+    # runs whose times, values, players etc. changed
+    edited: list[Run]
+    # IDs of runs that don't exist anymore
+    deleted: list[str]
+    # number of requests the sync took
+    requests: int
+
+    def __bool__(self) -> bool:
+        return bool(
+            self.added or self.verified or self.rejected or self.edited or self.deleted
+        )
+
+
+def _submitted(run: dict) -> str:
+    return run["submitted"] or ""
+
+
+def _verified(run: dict) -> str:
+    return run["status"].get("verify-date") or ""
+
+
+class RunMirror:
+    """Local copy of every run of a set of games that is kept up to date
+    incrementally. A sync walks the runs of a game newest first, by
+    submission and by verification date, only until it reaches runs that
+    were already seen, and checks the runs that were waiting for
+    verification, so a refresh takes a page or two instead of every run.
+    Runs are kept without embeds in an SQLite database
+    Args:
+        api: client the runs are requested through
+        path: location of the database file, kept in memory if omitted
+    """
+
+    def __init__(self, api: SRC, path: str = ":memory:"):
+        self.api = api
+        self.path = path
+        # one connection shared by the threads of sync_many, so an in memory
+        # database is the same for every thread
+        self._con = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._con as con:
+            if path != ":memory:":
+                con.execute("PRAGMA journal_mode=WAL")
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS runs (id TEXT PRIMARY KEY, game TEXT, "
+                "status TEXT, submitted TEXT, verified TEXT, data BLOB)"
+            )
+            con.execute("CREATE INDEX IF NOT EXISTS runs_game ON runs(game, status)")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._con.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+
+    def __contains__(self, run_id: str) -> bool:
+        return run_id in self._stored([run_id])
+
+    def _query(self, sql: str, args: Iterable = ()) -> list[tuple]:
+        with self._lock:
+            return self._con.execute(sql, tuple(args)).fetchall()
+
+    def _stored(self, run_ids: list[str]) -> dict[str, bytes]:
+        """Saved payloads of the runs that are in the mirror"""
+        marks = ",".join("?" * len(run_ids))
+        rows = self._query(f"SELECT id, data FROM runs WHERE id IN ({marks})", run_ids)
+        return dict(rows)
+
+    def _save(self, runs: list[dict]):
+        rows = [
+            (
+                r["id"],
+                r["game"],
+                r["status"]["status"],
+                _submitted(r),
+                _verified(r),
+                jsonlib.dumps(r),
+            )
+            for r in runs
+        ]
+        with self._lock, self._con as con:
+            con.executemany(
+                "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+
+    def _delete(self, run_ids: list[str]):
+        with self._lock, self._con as con:
+            con.executemany("DELETE FROM runs WHERE id = ?", [(i,) for i in run_ids])
+
+    def _run(self, data: dict) -> Run:
+        return Run(data, keep_data=self.api.keep_data, registry=self.api.registry)
+
+    def _walk(self, params: dict) -> Iterator[list[dict]]:
+        # pages are requested one at a time and never served from the cache
+        params = {"orderby": "submitted", "direction": "desc", **params}
+        uri, params, _ = self.api._prepare_get("runs", params, False)
+        return self.api._pages(uri, params)
+
+    def sync(self, game_id: str, full: bool = False) -> RunDelta:
+        """Brings the runs of a game up to date and returns what changed.
+        The first sync of a game downloads all of its runs
+        Args:
+            full: walks every run of the game, this is the only way to find
+                older verified runs that were deleted, rejected or edited
+        """
+        delta = RunDelta(game_id, [], [], [], [], [], 0)
+        requests = 0
+        (newest_submitted, newest_verified, count), *_ = self._query(
+            "SELECT max(submitted), max(verified), COUNT(*) FROM runs WHERE game = ?",
+            (game_id,),
+        )
+        full = full or not count
+        seen: set[str] = set()
+
+        def apply(page: list[dict]):
+            old = self._stored([r["id"] for r in page])
+            changed = []
+            for run in page:
+                seen.add(run["id"])
+                saved = old.get(run["id"])
+                if saved == jsonlib.dumps(run):
+                    continue
+                changed.append(run)
+                status = run["status"]["status"]
+                if saved is None:
+                    delta.added.append(self._run(run))
+                elif status == jsonlib.loads(saved)["status"]["status"]:
+                    delta.edited.append(self._run(run))
+                elif status == "verified":
+                    delta.verified.append(self._run(run))
+                elif status == "rejected":
+                    delta.rejected.append(self._run(run))
+                else:
+                    delta.edited.append(self._run(run))
+            self._save(changed)
+
+        # new submissions, and runs whose status changed since they were seen
+        for page in self._walk({"game": game_id}):
+            requests += 1
+            apply(page)
+            if not full and page and _submitted(page[-1]) < newest_submitted:
+                break
+        if not full:
+            # runs verified since the last sync
+            params = {"game": game_id, "status": "verified", "orderby": "verify-date"}
+            for page in self._walk(params):
+                requests += 1
+                apply(page)
+                if not page or _verified(page[-1]) < (newest_verified or ""):
+                    break
+            # runs that were waiting for verification and weren't seen yet
+            # have been verified before the last sync, rejected or deleted
+            pending = self._query(
+                "SELECT id FROM runs WHERE game = ? AND status = 'new'", (game_id,)
+            )
+            pending = [run_id for (run_id,) in pending if run_id not in seen]
+            if pending:
+                for page in self._walk({"game": game_id, "status": "new"}):
+                    requests += 1
+                    apply(page)
+            for run_id in pending:
+                if run_id in seen:
+                    continue
+                requests += 1
+                try:
+                    run = self.api._request("GET", API_URL + f"runs/{run_id}")
+                except SRCAPIException as e:
+                    if e.status_code != 404:
+                        raise
+                    delta.deleted.append(run_id)
+                else:
+                    apply([run["data"]])
+        else:
+            rows = self._query("SELECT id FROM runs WHERE game = ?", (game_id,))
+            delta.deleted.extend(run_id for (run_id,) in rows if run_id not in seen)
+        self._delete(delta.deleted)
+        return delta._replace(requests=requests)
+
+    def sync_many(
+        self, game_ids: Iterable[str], full: bool = False, max_workers: int = 4
+    ) -> Iterator[RunDelta]:
+        """Syncs several games concurrently within the rate limit,
+        yields the delta of each game as it completes"""
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = [
+                # so the workers use the projection of this thread
+                pool.submit(copy_context().run, self.sync, game_id, full)
+                for game_id in game_ids
+            ]
+            try:
+                for future in as_completed(futures):
+                    yield future.result()
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    # --local queries--
+    def data(self, game_id: str, status: Optional[str] = None) -> list[dict]:
+        """Returns the raw runs of a game, newest submission first"""
+        sql = "SELECT data FROM runs WHERE game = ?"
+        args: list[Any] = [game_id]
+        if status:
+            sql += " AND status = ?"
+            args.append(status)
+        rows = self._query(sql + " ORDER BY submitted DESC", args)
+        return [jsonlib.loads(d) for (d,) in rows]
+
+    def runs(self, game_id: str, status: Optional[str] = None) -> list[Run]:
+        """Returns the runs of a game, newest submission first"""
+        return [self._run(d) for d in self.data(game_id, status)]
+
+    def get(self, run_id: str) -> Optional[Run]:
+        rows = self._query("SELECT data FROM runs WHERE id = ?", (run_id,))
+        return self._run(jsonlib.loads(rows[0][0])) if rows else None
+
+    def games(self) -> list[str]:
+        """IDs of the games that have runs in the mirror"""
+        return [g for (g,) in self._query("SELECT DISTINCT game FROM runs")]
+
+    def table(self, game_id: str, status: Optional[str] = None) -> RunTable:
+        return RunTable.from_runs(self.data(game_id, status))
+
+    def forget(self, game_id: str):
+        """Removes every run of a game"""
+        with self._lock, self._con as con:
+            con.execute("DELETE FROM runs WHERE game = ?", (game_id,))
+
+    def close(self):
+        self._con.close()
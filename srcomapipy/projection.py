@@ -0,0 +1,131 @@
+import hashlib
+from contextvars import ContextVar
+from typing import Optional, Any, Iterable
+from .store import EMBEDS
+
+# fields the objects can't be built without, they're always kept
+REQUIRED: dict[str, frozenset[str]] = {
+    "runs": frozenset(
+        (
+            "id",
+            "game",
+            "category",
+            "level",
+            "values",
+            "status",
+            "times",
+            "system",
+            "date",
+            "submitted",
+            "players",
+        )
+    ),
+    "games": frozenset(("id", "names", "abbreviation")),
+    "categories": frozenset(("id", "name", "players", "type", "miscellaneous")),
+    "levels": frozenset(("id", "name")),
+    "variables": frozenset(
+        (
+            "id",
+            "name",
+            "mandatory",
+            "values",
+            "obsoletes",
+            "user-defined",
+            "is-subcategory",
+        )
+    ),
+    "users": frozenset(("id", "names", "rel", "name")),
+    "platforms": frozenset(("id", "name")),
+    "regions": frozenset(("id", "name")),
+}
+# embeds of every kind of response, including ones that aren't entities
+NESTED: dict[str, dict[str, str]] = {
+    **EMBEDS,
+    "leaderboards": {
+        "game": "games",
+        "category": "categories",
+        "level": "levels",
+        "players": "users",
+        "regions": "regions",
+        "platforms": "platforms",
+        "variables": "variables",
+    },
+    "personal-bests": {
+        "game": "games",
+        "category": "categories",
+        "level": "levels",
+        "players": "users",
+        "platform": "platforms",
+        "region": "regions",
+    },
+}
+
+
+class Projection:
+    """Fields that are kept of each kind of resource, everything else is
+    dropped from responses before they're cached or turned into objects.
+    Kinds that aren't listed are kept whole, fields needed to build the
+    objects and embedded resources are always kept, embedded resources are
+    projected as well. Attributes of dropped fields are None
+    Args:
+        fields: kind of resource e.g. "runs", "categories" mapped to the
+            names of the fields to keep as they appear in the API
+    """
+
+    def __init__(self, fields: dict[str, Iterable[str]]):
+        self.fields: dict[str, frozenset[str]] = {
+            kind: frozenset(keep) | REQUIRED.get(kind, frozenset())
+            for kind, keep in fields.items()
+        }
+        profile = repr(sorted((k, sorted(v)) for k, v in self.fields.items()))
+        # part of cache keys so projected and full responses are kept apart
+        self.key = "fields:" + hashlib.sha1(profile.encode()).hexdigest()[:16]
+
+    def apply(self, kind: str, data: Any) -> Any:
+        """Returns a projected copy of the data of a response of a kind"""
+        if isinstance(data, list):
+            return [self._project(kind, d) for d in data]
+        return self._project(kind, data)
+
+    def _project(self, kind: str, item: Any) -> Any:
+        if not isinstance(item, dict):
+            return item
+        keep = self.fields.get(kind)
+        nested = NESTED.get(kind, {})
+        projected = {}
+        for k, v in item.items():
+            if isinstance(v, dict) and "data" in v and k in nested:
+                v = {"data": self.apply(nested[k], v["data"])}
+            elif kind in ("leaderboards", "personal-bests") and k in ("run", "runs"):
+                v = self._project_runs(v)
+            elif keep is not None and k not in keep:
+                continue
+            projected[k] = v
+        return projected
+
+    def _project_runs(self, runs: dict | list[dict]) -> dict | list[dict]:
+        # leaderboards have a list of places and runs, personal bests one run
+        if isinstance(runs, list):
+            return [dict(r, run=self._project("runs", r["run"])) for r in runs]
+        return self._project("runs", runs)
+
+
+# keeps IDs, names, times, dates and what's needed to tell runs apart,
+# drops rules, rulesets, links, weblinks, videos and comments
+SLIM = Projection(
+    {
+        "runs": (),
+        "games": ("released", "release-date", "created"),
+        "categories": (),
+        "levels": (),
+        "variables": ("scope", "category"),
+        "users": (),
+        "platforms": (),
+        "regions": (),
+    }
+)
+
+# projections set for a block of code with SRC.projected, by client
+_overrides: ContextVar[dict[int, Optional[Projection]]] = ContextVar(
+    "projection_overrides", default={}
+)
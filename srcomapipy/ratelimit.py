@@ -0,0 +1,86 @@
+import time
+import random
+import threading
+from typing import Optional
+from email.utils import parsedate_to_datetime
+
+
+class RateLimiter:
+    """Token bucket limiting how many requests are sent, thread safe.
+    A single limiter can be shared by several clients to split one budget
+    Args:
+        requests: number of requests allowed per period
+        period: length of the period in seconds
+        burst: maximum number of requests that can be sent at once
+            after being idle, defaults to a tenth of the budget
+    """
+
+    def __init__(self, requests: int = 100, period: float = 60, burst: int = None):
+        self.rate = requests / period
+        self.capacity = burst if burst else max(1, requests // 10)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def reserve(self) -> float:
+        """Takes a token and returns the number of seconds to wait
+        before the request it was taken for may be sent"""
+        with self._lock:
+            self._refill()
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self):
+        """Blocks until a request may be sent"""
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+
+    def try_acquire(self) -> bool:
+        """Takes a token only if a request may be sent right away"""
+        with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def penalize(self, delay: float):
+        """Empties the bucket so no request is sent for the next delay seconds,
+        used when the API reports that the limit was exceeded anyway"""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, -delay * self.rate)
+
+
+def retry_delay(
+    attempt: int,
+    retry_after: Optional[str] = None,
+    backoff: float = 1.0,
+    max_delay: float = 60.0,
+) -> float:
+    """Returns how long to wait before retrying a request, honoring the
+    Retry-After header if given, otherwise exponential backoff with jitter
+    Args:
+        attempt: number of attempts that already failed, starting at 0
+        retry_after: value of the Retry-After header, seconds or an HTTP date
+        backoff: delay of the first retry in seconds
+        max_delay: upper bound of the delay
+    """
+    if retry_after:
+        try:
+            return min(max_delay, max(0.0, float(retry_after)))
+        except ValueError:
+            try:
+                until = parsedate_to_datetime(retry_after).timestamp()
+                return min(max_delay, max(0.0, until - time.time()))
+            except (TypeError, ValueError):
+                pass
+    return min(max_delay, backoff * 2**attempt) * random.uniform(0.5, 1.0)
@@ -1,11 +1,37 @@
+import time
 import requests
-from typing import Literal, Optional, Any
+from requests.adapters import HTTPAdapter
+from typing import Literal, Optional, Any, NamedTuple, Generator, Iterator, Callable
 from datetime import date
 from .srctypes import *
-from itertools import groupby
+from .cache import Cache, MemoryCache, DEPENDENT, strip_embeds, freeze, _kind
+from .store import EntityStore, KINDS as STORE_KINDS, SUB_RESOURCES
+from .table import RunTable
+from . import jsonlib
+from .stream import StreamParser
+from .projection import Projection, SLIM, _overrides
+from .ratelimit import RateLimiter, retry_delay
+from .metrics import Metrics
+from .watch import QueueWatcher, QueueEvent, NotificationCursor
+from itertools import groupby, product
+from functools import wraps, partial
+from contextlib import nullcontext, contextmanager
+from contextvars import copy_context
+from concurrent.futures import (
+    ThreadPoolExecutor,
+    Future,
+    wait,
+    as_completed,
+    FIRST_COMPLETED,
+)
+from threading import Lock, Event
 from urllib.parse import urlparse
 
 API_URL = "https://www.speedrun.com/api/v1/"
+# status codes the API responds with when the rate limit is exceeded
+THROTTLED = (420, 429)
+# size of the chunks streamed responses are read in
+STREAM_CHUNK = 1 << 16
 
 
 # API BUGS:
@@ -15,105 +41,686 @@ API_URL = "https://www.speedrun.com/api/v1/"
 # potential bug when using orderby category for get runs, not all runs are retrieved
 # TODO:
 # [] Comprehensive docs
-# [] Change list returns to iterators
-# [] improve chache
+# [x] Change list returns to iterators
+# [x] improve chache
 # [x] at risk runs for user
 
 
+class _Call(NamedTuple):
+    """A single API request yielded by an endpoint method"""
+
+    uri: str
+    params: Optional[dict] = None
+    bulk: bool = False
+    method: Literal["GET", "POST", "PUT", "DELETE"] = "GET"
+    json: Optional[dict] = None
+    limit: Optional[int] = None
+
+
+def _endpoint(func):
+    """Endpoint methods are written as generators that yield the requests they need
+    and receive the response data back. SRC performs these requests synchronously
+    while AsyncSRC awaits them, so both clients share the same parsing code.
+    The undecorated generator is kept as `steps` to be reused by other endpoints"""
+
+    @wraps(func)
+    def wrapper(self: "SRC", *args, **kwargs):
+        return self._drive(func(self, *args, **kwargs))
+
+    wrapper.steps = func
+    return wrapper
+
+
+def _join_embeds(embeds: Optional[list[str]], *defaults: str) -> str:
+    """Joins embeds into a deduplicated and sorted embed parameter,
+    so identical requests always produce the same query"""
+    embeds = set(defaults).union(*[e.split(",") for e in embeds or []])
+    embeds.discard("")
+    return ",".join(sorted(embeds))
+
+
 class SRC:
     TIME_FORMAT = "%H:%M:%S"
     DATE_FORMAT = "%d-%m-%y"
     DATETIME_FORMAT = f"{DATE_FORMAT} {TIME_FORMAT}"
 
-    def __init__(self, api_key: str = "", user_agent: str = "Green-Bat/srcomapipy"):
-        self.cache: dict[tuple[str, tuple], dict | list] = dict()
+    def __init__(
+        self,
+        api_key: str = "",
+        user_agent: str = "Green-Bat/srcomapipy",
+        session: Optional[requests.Session] = None,
+        pool_size: int = 10,
+        timeout: float | tuple[float, float] = (5, 30),
+        cache: Optional[Cache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_retries: int = 5,
+        hedge_after: Optional[float] = None,
+        keep_data: bool = True,
+        store: Optional[EntityStore] = None,
+        json_loads: Optional[Callable[[bytes], Any]] = None,
+        projection: Optional[Projection] = None,
+    ):
+        """
+        Args:
+            api_key: speedrun.com API key, required for authenticated endpoints
+            user_agent: sent with every request to identify the client
+            session: an existing session to send requests through, it will not be
+                closed by close(). A pooled keep-alive session is created if omitted
+            pool_size: number of connections kept alive per host
+            timeout: seconds to wait for a response, either a single number
+                or a (connect, read) tuple
+            cache: where responses of GET requests are cached,
+                a MemoryCache with the default limits is used if omitted
+            rate_limiter: limits the rate of all requests, share one between
+                clients to split the budget. Defaults to 100 requests per minute
+            max_retries: how often a throttled request, or a GET request that
+                failed to connect or got a 5xx response, is retried
+            hedge_after: if a GET request takes longer than this many seconds
+                after it was sent, a duplicate is sent if the rate limiter has
+                a token to spare and whichever responds first is used
+            keep_data: determines if returned objects keep the raw response
+                in their data attribute, disable to save memory
+            store: where entities found in responses are kept to answer
+                get_category, get_level and get_variable without a request
+                while they're fresh, an EntityStore is used if omitted.
+                Use invalidate to drop stale data from both cache and store
+            json_loads: parses response bodies, orjson is used if installed
+            projection: fields of responses that are kept, e.g. SLIM, everything
+                else is dropped before it's cached. Every field is kept if omitted
+        """
+        self.cache: Cache = cache if cache is not None else MemoryCache()
+        self.rate_limiter = rate_limiter if rate_limiter else RateLimiter()
+        self.max_retries = max_retries
+        self.hedge_after = hedge_after
+        self.keep_data = keep_data
+        # shares embedded categories, levels, variables, users etc. between objects
+        self.registry = Registry()
+        self.store = store if store is not None else EntityStore()
+        self.json_loads = json_loads if json_loads else jsonlib.loads
+        self.projection = projection
+        self.metrics = Metrics()
+        self._hedge_pool: Optional[ThreadPoolExecutor] = None
+        self.pool_size = pool_size
         self.api_key = api_key
         self.user_agent = user_agent
-        self.headers = {"User-Agent": user_agent}
+        self.timeout = timeout
+        self.headers = {
+            "User-Agent": user_agent,
+            "Accept-Encoding": "gzip, deflate",
+            "Connection": "keep-alive",
+        }
         if api_key:
             self.headers["X-API-Key"] = api_key
+        self._owns_session = session is None
+        self.session = session if session else self._create_session(pool_size)
+        # requests currently being sent, concurrent identical requests wait for these
+        self._in_flight: dict[tuple, Future] = {}
+        self._in_flight_lock = Lock()
 
-    def post(self, uri, json: dict) -> dict:
-        uri = API_URL + uri
-        r = requests.post(uri, headers=self.headers, json=json)
+    def _drive(self, steps: Generator[_Call, Any, Any]) -> Any:
+        try:
+            call = next(steps)
+            while True:
+                call = steps.send(self._perform(call))
+        except StopIteration as done:
+            return done.value
+
+    def _perform(self, call: _Call) -> Any:
+        if call.method == "POST":
+            return self.post(call.uri, call.json)
+        if call.method == "PUT":
+            return self.put(call.uri, call.json)
+        if call.method == "DELETE":
+            return self.delete(call.uri)
+        return self.get(call.uri, call.params, call.bulk, call.limit)
+
+    def _create_session(self, pool_size: int) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def close(self):
+        """Closes the underlying session if it was created by this client"""
+        if self._hedge_pool:
+            self._hedge_pool.shutdown(wait=False)
+        if self._owns_session:
+            self.session.close()
+
+    def stats(self) -> dict[str, Any]:
+        """Request counters, recent p50/p99 latencies in seconds and cache counters"""
+        stats = self.metrics.snapshot()
+        stats["cache"] = self.cache.stats()
+        return stats
+
+    def __enter__(self) -> "SRC":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _send(self, method: str, uri: str, **kwargs) -> requests.Response:
+        start = time.perf_counter()
+        try:
+            r = self.session.request(
+                method, uri, headers=self.headers, timeout=self.timeout, **kwargs
+            )
+        except requests.Timeout:
+            self.metrics.count("timeouts")
+            raise
+        self.metrics.observe(time.perf_counter() - start)
+        return r
+
+    def _send_hedged(self, uri: str, **kwargs) -> requests.Response:
+        if self._hedge_pool is None:
+            self._hedge_pool = ThreadPoolExecutor(max_workers=self.pool_size)
+        first = self._hedge_pool.submit(self._send, "GET", uri, **kwargs)
+        # the timer starts once the request got its token, and a request is
+        # only hedged if there's a token to spare
+        if wait([first], timeout=self.hedge_after).done:
+            return first.result()
+        if not self.rate_limiter.try_acquire():
+            return first.result()
+        self.metrics.count("hedged")
+        hedge = self._hedge_pool.submit(self._send, "GET", uri, **kwargs)
+        pending = {first, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for f in done:
+                if f.exception() is None:
+                    if f is hedge:
+                        self.metrics.count("hedge_wins")
+                    return f.result()
+        return first.result()
+
+    def _request(
+        self, method: str, uri: str, exc: type = SRCAPIException, **kwargs
+    ) -> dict | requests.Response:
+        """Sends a request, retrying it if needed, and returns the parsed body,
+        or the unread response if stream is passed"""
+        idempotent = method == "GET"
+        stream = kwargs.get("stream", False)
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            self.rate_limiter.acquire()
+            try:
+                if idempotent and self.hedge_after and not stream:
+                    r = self._send_hedged(uri, **kwargs)
+                else:
+                    r = self._send(method, uri, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if not idempotent or last_attempt:
+                    self.metrics.count("errors")
+                    raise
+                self.metrics.count("retries")
+                time.sleep(retry_delay(attempt))
+                continue
+            retry = r.status_code in THROTTLED or (r.status_code >= 500 and idempotent)
+            if retry and not last_attempt:
+                # unread streamed responses hold on to their connection
+                r.close()
+            if r.status_code in THROTTLED and not last_attempt:
+                self.metrics.count("throttled")
+                # the limiter makes every other request wait out the delay as well
+                self.rate_limiter.penalize(
+                    retry_delay(attempt, r.headers.get("Retry-After"))
+                )
+            elif r.status_code >= 500 and idempotent and not last_attempt:
+                self.metrics.count("retries")
+                time.sleep(retry_delay(attempt))
+            else:
+                break
+        if stream and r.status_code < 400:
+            return r
+        # the body is parsed exactly once, everything after works on the dict
+        body = self.json_loads(r.content)
         if r.status_code >= 400:
-            raise SRCRunException(r.status_code, uri[len(API_URL) :], r.json())
-        return r.json()["data"]
+            self.metrics.count("errors")
+            raise exc(r.status_code, uri[len(API_URL) :], body)
+        return body
+
+    def invalidate(self, prefix: str = ""):
+        """Drops the cached responses whose uri starts with prefix and the
+        stored entities of that kind, or everything if prefix is empty"""
+        self.cache.invalidate(prefix)
+        kind = prefix.split("/")[0]
+        if not kind:
+            self.store.clear()
+        elif kind in STORE_KINDS:
+            self.store.invalidate(kind)
+            # games/{id}/categories etc. are stored as their own kind
+            if kind == "games":
+                for sub_kind in set(SUB_RESOURCES.values()):
+                    self.store.invalidate(sub_kind)
+
+    def _written(self, uri: str):
+        """Drops the cached responses that a write to uri made stale"""
+        root = uri.split("/")[0]
+        if root in DEPENDENT:
+            self.cache.invalidate_kinds(DEPENDENT[root])
+        else:
+            self.invalidate(root)
+
+    def post(self, uri, json: dict) -> dict:
+        body = self._request("POST", API_URL + uri, SRCRunException, json=json)
+        self._written(uri)
+        return body["data"]
 
     def put(self, uri: str, json: dict) -> dict:
-        uri = API_URL + uri
-        r = requests.put(uri, headers=self.headers, json=json)
-        if r.status_code >= 400:
-            raise SRCAPIException(r.status_code, uri[len(API_URL) :], r.json())
-        return r.json()["data"]
+        body = self._request("PUT", API_URL + uri, json=json)
+        self._written(uri)
+        return body["data"]
 
-    def get(
-        self, uri: str, params: dict = None, bulk: bool = False
-    ) -> Optional[dict | list[dict]]:
-        uri = API_URL + uri
+    def delete(self, uri: str) -> dict:
+        body = self._request("DELETE", API_URL + uri)
+        self._written(uri)
+        return body["data"]
+
+    def _prepare_get(
+        self, uri: str, params: Optional[dict], bulk: bool, limit: Optional[int] = None
+    ) -> tuple[str, dict, tuple[str, tuple]]:
         if params:
             params["max"] = 200 if not bulk else 1000
+            if limit:
+                params["max"] = min(limit, params["max"])
         else:
             params = {}
-        key = (uri, tuple(sorted(params.values(), key=lambda p: str(p))))
-        data: dict | list[dict] = self.cache.get(key)
+        if "embed" in params:
+            params["embed"] = _join_embeds([params["embed"]])
+        # max follows from _bulk and the limit, leaving it out lets requests
+        # without other parameters share keys with the same request with embeds
+        key = (
+            uri,
+            tuple(sorted((k, str(v)) for k, v in params.items() if k != "max")),
+        )
+        if limit is not None:
+            key += (limit,)
+        projection = self._projection()
+        if projection is not None:
+            key += (projection.key,)
+        return API_URL + uri, params, key
+
+    def _next_page(self, body: dict) -> Optional[str]:
+        """Returns the uri of the next page of a paginated response if there is one"""
+        if "pagination" not in body:
+            return None
+        next_link = body["pagination"]["links"]
+        if not next_link or (len(next_link) == 1 and next_link[0]["rel"] == "prev"):
+            return None
+        elif len(next_link) == 1:
+            return next_link[0]["uri"]
+        return next_link[1]["uri"]
+
+    @contextmanager
+    def projected(self, projection: Optional[Projection] = SLIM):
+        """Uses a projection for the requests made inside a with block
+        instead of the client's, None keeps every field. Only affects
+        the current thread or task and the ones it starts
+        """
+        overrides = dict(_overrides.get())
+        overrides[id(self)] = projection
+        token = _overrides.set(overrides)
+        try:
+            yield self
+        finally:
+            _overrides.reset(token)
+
+    def _projection(self) -> Optional[Projection]:
+        overrides = _overrides.get()
+        if id(self) in overrides:
+            return overrides[id(self)]
+        return self.projection
+
+    def _project(self, uri: str, data: dict | list[dict]) -> dict | list[dict]:
+        projection = self._projection()
+        if projection is None:
+            return data
+        return projection.apply(_kind(uri[len(API_URL) :].split("?")[0]), data)
+
+    def _take(
+        self, body: dict, remaining: Optional[int]
+    ) -> tuple[dict | list[dict], Optional[int], Optional[str]]:
+        """Cuts the data of a page down to the remaining number of items.
+        Returns the data, the new remaining number and the next page uri
+        which is None once the limit is reached"""
+        data = body["data"]
+        if remaining is not None and isinstance(data, list):
+            data = data[:remaining]
+            remaining -= len(data)
+            if remaining <= 0:
+                return data, remaining, None
+        return data, remaining, self._next_page(body)
+
+    def _pages(
+        self,
+        uri: str,
+        params: dict,
+        prefetch: bool = False,
+        limit: Optional[int] = None,
+    ) -> Iterator[dict | list[dict]]:
+        body = self._request("GET", uri, params=params)
+        with ThreadPoolExecutor(max_workers=1) if prefetch else nullcontext() as pool:
+            while True:
+                data, limit, next_link = self._take(body, limit)
+                data = self._project(uri, data)
+                if next_link and pool:
+                    future = pool.submit(self._request, "GET", next_link)
+                yield data
+                if not next_link:
+                    return
+                body = future.result() if pool else self._request("GET", next_link)
+
+    def get(
+        self,
+        uri: str,
+        params: dict = None,
+        bulk: bool = False,
+        limit: Optional[int] = None,
+    ) -> Optional[dict | list[dict]]:
+        """Sends a GET request and follows pagination
+        Args:
+            uri: endpoint relative to the API url
+            params: query parameters
+            bulk: flag for bulk mode, increases the page size
+            limit: maximum number of items to return, no further pages
+                are requested once it is reached
+        """
+        uri, params, key = self._prepare_get(uri, params, bulk, limit)
+        data: dict | list[dict] = self.cache.get_embedded(key)
         if data is not None:
             return data
-        r = requests.get(uri, headers=self.headers, params=params)
-        if r.status_code >= 400:
-            raise SRCAPIException(r.status_code, uri[len(API_URL) :], r.json())
-        data = r.json()["data"]
-        if "pagination" in r.json():
-            while next_link := r.json()["pagination"]["links"]:
-                if len(next_link) == 1 and next_link[0]["rel"] == "prev":
-                    break
-                elif len(next_link) == 1:
-                    next_link = next_link[0]["uri"]
+        wide_key = self.cache.widen(key)
+        if wide_key is key:
+            return self._fetch(uri, params, limit, key)
+        params = dict(params, embed=dict(wide_key[1])["embed"])
+        data = self._fetch(uri, params, limit, wide_key)
+        return strip_embeds(data, wide_key, key) if data is not None else None
+
+    def _fetch(
+        self, uri: str, params: dict, limit: Optional[int], key: tuple
+    ) -> Optional[dict | list[dict]]:
+        data = None
+        with self._in_flight_lock:
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[key] = Future()
+        if not leader:
+            return flight.result()
+        try:
+            for page in self._pages(uri, params, limit=limit):
+                if data is None:
+                    data = page
                 else:
-                    next_link = next_link[1]["uri"]
-                r = requests.get(next_link, headers=self.headers)
-                if r.status_code >= 400:
-                    raise SRCAPIException(r.status_code, uri[len(API_URL) :], r.json())
-                data.extend(r.json()["data"])
-        self.cache[key] = data
+                    data.extend(page)
+            # shared by the cache and every caller, so it's never modified
+            data = freeze(data)
+            self.cache.set(key, data, self.cache.ttl_for(key[0], params))
+            self._store(key, params, data)
+            flight.set_result(data)
+            return data
+        except BaseException as e:
+            flight.set_exception(e)
+            raise
+        finally:
+            with self._in_flight_lock:
+                del self._in_flight[key]
+
+    def iter_pages(
+        self,
+        uri: str,
+        params: dict = None,
+        bulk: bool = False,
+        prefetch: bool = False,
+        limit: Optional[int] = None,
+    ) -> Iterator[dict | list[dict]]:
+        """Yields the data of each page of a request as soon as it arrives,
+        pages are not cached
+        Args:
+            prefetch: requests the next page in the background
+                while the current one is being consumed
+            limit: maximum number of items to yield
+        """
+        uri, params, key = self._prepare_get(uri, params, bulk, limit)
+        data: dict | list[dict] = self.cache.get_embedded(key)
+        if data is not None:
+            yield data
+            return
+        for page in self._pages(uri, params, prefetch, limit):
+            self._store(key, params, page)
+            yield page
+
+    def _store(self, key: tuple, params: dict, data: Optional[dict | list[dict]]):
+        # bulk and projected responses only have some of the fields
+        if data is None or params.get("_bulk") or self._projection() is not None:
+            return
+        # endpoints without a ttl are fresh as long as the store's ttl
+        self.store.add_response(key[0], data, self.cache.ttl_for(key[0], params))
+
+    def _stored(self, kind: str, id: str, embeds: str = "") -> Optional[dict]:
+        data = self.store.lookup(kind, id, embeds)
+        if data is not None:
+            self.metrics.count("store_hits")
         return data
 
+    def iter_stream(
+        self,
+        uri: str,
+        params: dict = None,
+        bulk: bool = False,
+        limit: Optional[int] = None,
+    ) -> Iterator[dict]:
+        """Yields the items of a request one by one while the response is still
+        being read, so only one item of a page is in memory at a time.
+        Items are neither cached nor stored
+        Args:
+            limit: maximum number of items to yield
+        """
+        uri, params, key = self._prepare_get(uri, params, bulk, limit)
+        data: dict | list[dict] = self.cache.get_embedded(key)
+        if isinstance(data, dict):
+            raise ValueError("data of the response is not a list of items")
+        if data is not None:
+            yield from data
+            return
+        while uri:
+            parser = StreamParser()
+            with self._request("GET", uri, params=params, stream=True) as r:
+                for chunk in r.iter_content(STREAM_CHUNK):
+                    for item in parser.feed(chunk):
+                        yield self._project(uri, item)
+                        if limit is not None:
+                            limit -= 1
+                            if limit <= 0:
+                                return
+            parser.close()
+            uri, params = self._next_page(parser.fields), None
+
+    def _iter_items(
+        self,
+        call: _Call,
+        parse: Callable[[dict], Any],
+        prefetch: bool,
+        stream: bool = False,
+    ) -> Iterator[Any]:
+        if stream:
+            for item in self.iter_stream(call.uri, call.params, call.bulk, call.limit):
+                yield parse(item)
+            return
+        pages = self.iter_pages(call.uri, call.params, call.bulk, prefetch, call.limit)
+        for page in pages:
+            for item in page:
+                yield parse(item)
+
+    def _first_call(self, endpoint: Callable, *args, **kwargs) -> _Call:
+        """Returns the request an endpoint method would send first, without sending it"""
+        steps = endpoint.steps(self, *args, **kwargs)
+        call = next(steps)
+        steps.close()
+        return call
+
+    def iter_runs(
+        self, prefetch: bool = False, stream: bool = False, **filters
+    ) -> Iterator[Run]:
+        """Iterates over runs page by page, each run is yielded as soon as
+        its page arrives instead of after all pages have been downloaded
+        Args:
+            prefetch: requests the next page in the background
+                while the current one is being consumed
+            stream: parses each page while it's being read and yields runs
+                one by one, keeps memory bounded but can't prefetch
+            filters: any argument of get_runs except run_id and time_sort
+        """
+        call = self._first_call(SRC.get_runs, **filters)
+        return self._iter_items(
+            call,
+            partial(Run, keep_data=self.keep_data, registry=self.registry),
+            prefetch,
+            stream,
+        )
+
+    def get_run_table(self, prefetch: bool = False, **filters) -> RunTable:
+        """Downloads runs straight into a columnar RunTable without building
+        Run objects, nothing is embedded since the table only keeps IDs
+        Args:
+            prefetch: requests the next page in the background
+            filters: any argument of get_runs except run_id and time_sort
+        """
+        call = self._first_call(SRC.get_runs, **filters)
+        params = {k: v for k, v in call.params.items() if k != "embed"}
+        table = RunTable()
+        for page in self.iter_pages(call.uri, params, call.bulk, prefetch, call.limit):
+            table.extend(page)
+        return table
+
+    def iter_games(
+        self, prefetch: bool = False, stream: bool = False, **filters
+    ) -> Iterator[Game]:
+        """Iterates over games page by page, see iter_runs. Use stream with
+        bulk to go through the whole catalog in bounded memory
+        Args:
+            filters: any argument of search_game
+        """
+        call = self._first_call(SRC.search_game, **filters)
+        parse = partial(
+            Game, bulk=call.bulk, keep_data=self.keep_data, registry=self.registry
+        )
+        return self._iter_items(call, parse, prefetch, stream)
+
+    def iter_users(
+        self, prefetch: bool = False, stream: bool = False, **filters
+    ) -> Iterator[User]:
+        """Iterates over users page by page, see iter_runs
+        Args:
+            filters: any argument of get_users except user_id
+        """
+        call = self._first_call(SRC.get_users, **filters)
+        parse = partial(User, keep_data=self.keep_data)
+        return self._iter_items(call, parse, prefetch, stream)
+
+    def iter_notifications(
+        self,
+        direction: Literal["asc", "desc"] = "desc",
+        prefetch: bool = False,
+        limit: Optional[int] = None,
+    ) -> Iterator[Notification]:
+        """Iterates over the notifications of the current authenticated user
+        page by page, see iter_runs. Requires API Key"""
+        if not self.api_key:
+            raise SRCException("An API Key is required to get notifications")
+        call = self._first_call(SRC.get_notifications, direction, limit)
+        return self._iter_items(call, Notification, prefetch)
+
+    @_endpoint
     def get_current_profile(self) -> Optional[User]:
         """Returns the currently authenticated User. Requires API Key"""
-        return User(self.get("profile")) if self.api_key else None
+        if not self.api_key:
+            return None
+        return User((yield _Call("profile")), self.keep_data)
 
+    @_endpoint
     def get_notifications(
-        self, direction: Literal["asc", "desc"] = "desc"
+        self, direction: Literal["asc", "desc"] = "desc", limit: Optional[int] = None
     ) -> Optional[list[Notification]]:
         """Gets the notifications for the current authenticated user. Requires API Key
         Args:
             direction: sorts ascendingly (oldest first) or descendingly (newest first)
+            limit: maximum number of notifications to return
         """
         if not self.api_key:
             return None
         uri = "notifications"
         payload = {"orderby": "created", "direction": direction}
-        return [Notification(n) for n in self.get(uri, payload)]
+        data = yield _Call(uri, payload, limit=limit)
+        return [Notification(n) for n in data]
 
+    def _feed_request(
+        self, cursor: NotificationCursor, page_size: int
+    ) -> tuple[str, dict]:
+        params = {"orderby": "created", "direction": "desc"}
+        uri, params, _ = self._prepare_get("notifications", params, False)
+        # a new cursor reads the whole history, so it gets full pages
+        if cursor.created is not None:
+            params["max"] = page_size
+        return uri, params
+
+    def get_new_notifications(
+        self, cursor: NotificationCursor, page_size: int = 20
+    ) -> list[Notification]:
+        """Returns the notifications created since the cursor, newest first, and
+        moves the cursor past them. Pages are requested only until a notification
+        that was already seen, so polling usually takes one small request.
+        Requires API Key
+        Args:
+            cursor: where the notifications were read up to, updated in place
+            page_size: number of notifications per request once the cursor
+                has read the history, the first read uses full pages
+        """
+        if not self.api_key:
+            raise SRCException("An API Key is required to get notifications")
+        new = []
+        # always sent, a cached page could hide new notifications
+        for page in self._pages(*self._feed_request(cursor, page_size)):
+            fresh = [n for n in page if cursor.is_new(n)]
+            new += fresh
+            if len(fresh) < len(page):
+                break
+        cursor.advance(new)
+        return [Notification(n) for n in new]
+
+    @_endpoint
     def get_guest(self, name: str) -> Guest:
         """Gets a specific guest by their name"""
-        return Guest(self.get(f"guests/{name}"))
+        return Guest((yield _Call(f"guests/{name}")))
 
+    @_endpoint
     def get_variable(self, var_id: str) -> Variable:
         """Gets a specific variable by its ID"""
-        return Variable(self.get(f"variables/{var_id}"))
+        data = self._stored("variables", var_id)
+        if data is None:
+            data = yield _Call(f"variables/{var_id}")
+        return Variable(data, self.keep_data)
 
+    @_endpoint
     def get_category(self, cat_id: str) -> Category:
         """Gets a category by its ID, game and variables are embedded by default"""
-        return Category(self.get(f"categories/{cat_id}", {"embed": "game,variables"}))
+        data = self._stored("categories", cat_id, "game,variables")
+        if data is None:
+            data = yield _Call(f"categories/{cat_id}", {"embed": "game,variables"})
+        return Category(data, self.keep_data, self.registry)
 
+    @_endpoint
     def get_level(self, lvl_id: str) -> Level:
         """Gets a level by its ID, categories and their variables
         and the variables of the level are embedded by default"""
-        return Level(
-            self.get(f"levels/{lvl_id}", {"embed": "categories.variables,variables"})
-        )
+        embeds = "categories.variables,variables"
+        data = self._stored("levels", lvl_id, embeds)
+        if data is None:
+            data = yield _Call(f"levels/{lvl_id}", {"embed": embeds})
+        return Level(data, self.keep_data, self.registry)
 
+    @_endpoint
     def generic_get(
         self,
         endpoint: Literal[
@@ -128,6 +735,7 @@ class SRC:
         id: str = "",
         orderby: Literal["name", "released"] = "name",
         direction: Literal["asc", "desc"] = "asc",
+        limit: Optional[int] = None,
     ) -> SRCType | list[SRCType]:
         """Used to get any of the following resources:
         developers, publishers, genres, gametypes, engines, platforms, regions
@@ -136,13 +744,16 @@ class SRC:
             id: ID of the desired resource
             orderby: "name", sorts by name alphanumerically.
                 "released", sorts by release date, only available for the "platforms" endpoint
+            limit: maximum number of resources to return
         """
         srcobj = TYPES[endpoint]
         if id:
-            return srcobj(self.get(f"{endpoint}/{id}"))
+            return srcobj((yield _Call(f"{endpoint}/{id}")))
         payload = {"orderby": orderby, "direction": direction}
-        return [srcobj(srct) for srct in self.get(endpoint, payload)]
+        data = yield _Call(endpoint, payload, limit=limit)
+        return [srcobj(srct) for srct in data]
 
+    @_endpoint
     def search_game(
         self,
         name: str = "",
@@ -164,6 +775,7 @@ class SRC:
         direction: Literal["asc", "desc"] = "desc",
         embeds: list[str] = None,
         bulk: bool = False,
+        limit: Optional[int] = None,
     ) -> list[Game]:
         """Searches for a game based on the arguments, categories and levels
         are awlays embedded along with their variables except when using bulk mode
@@ -176,15 +788,14 @@ class SRC:
             direction: also determines sorting, ascending or descending
             embeds: list of resources to embed e.g. ["platforms","moderators"]
             bulk: flag for bulk mode
+            limit: maximum number of games to return
         """
         uri = "games"
         if series:
             uri = f"series/{series.id}/{uri}"
         if name and not orderby:
             orderby = "similarity"
-        if not embeds:
-            embeds = []
-        embeds = ",".join(set(embeds + ["categories.variables", "levels.variables"]))
+        embeds = _join_embeds(embeds, "categories.variables", "levels.variables")
         payload = {
             "name": name,
             "abbreviation": abv,
@@ -203,8 +814,10 @@ class SRC:
             "_bulk": bulk,
         }
         payload = {k: v for k, v in payload.items() if v}
-        return [Game(game, bulk) for game in self.get(uri, payload, bulk)]
+        data = yield _Call(uri, payload, bulk, limit=limit)
+        return [Game(game, bulk, self.keep_data, self.registry) for game in data]
 
+    @_endpoint
     def get_game(self, game_id: str, embeds: list[str] = None) -> Game:
         """Gets a game based on its ID
         Args:
@@ -212,22 +825,28 @@ class SRC:
             embeds: list of resources to embed,
                 categories/levels and their variables are always embedded
         """
-        if embeds is None:
-            embeds = []
         # embed categories and their variables and levels by default
-        embeds = ",".join(set(embeds + ["categories.variables", "levels.variables"]))
+        embeds = _join_embeds(embeds, "categories.variables", "levels.variables")
         uri = f"games/{game_id}"
-        game = Game(self.get(uri, {"embed": embeds}))
-        game.derived_games = self.get_derived_games(game)
+        game = Game(
+            (yield _Call(uri, {"embed": embeds})),
+            keep_data=self.keep_data,
+            registry=self.registry,
+        )
+        game.derived_games = yield from SRC.get_derived_games.steps(self, game)
         return game
 
+    @_endpoint
     def get_derived_games(self, game: Game) -> Optional[list[Game]]:
         """Gets all derived games for a specific game"""
         derived_uri = f"games/{game.id}/derived-games"
-        data = self.get(derived_uri)
-        derived_games = [Game(d) for d in data]
+        data = yield _Call(derived_uri)
+        derived_games = [
+            Game(d, keep_data=self.keep_data, registry=self.registry) for d in data
+        ]
         return derived_games if len(derived_games) > 0 else None
 
+    @_endpoint
     def get_series(
         self,
         series_id: str = "",
@@ -238,6 +857,7 @@ class SRC:
             "name.int", "name.jap", "abbreviation", "created"
         ] = "name.int",
         direction: Literal["asc", "desc"] = "asc",
+        limit: Optional[int] = None,
     ) -> Series | list[Series]:
         """Gets a game series by ID or a list of series based on the arguments.
         Moderators are embedded by default
@@ -248,11 +868,13 @@ class SRC:
             mod_id: gets series that are moderated by this user
             orderby: determines sorting method
             direction: determines direction of sorting
+            limit: maximum number of series to return
         """
         uri = "series"
         if series_id:
             uri += f"/{series_id}"
-            return Series(self.get(uri, {"embed": "moderators"}))
+            data = yield _Call(uri, {"embed": "moderators"})
+            return Series(data, self.keep_data)
         payload = {
             "name": name,
             "abbreviation": abbreviation,
@@ -262,8 +884,10 @@ class SRC:
             "embed": "moderators",
         }
         payload = {k: v for k, v in payload.items() if v}
-        return [Series(s) for s in self.get(uri, payload)]
+        data = yield _Call(uri, payload, limit=limit)
+        return [Series(s, self.keep_data) for s in data]
 
+    @_endpoint
     def get_users(
         self,
         user_id: str = "",
@@ -275,6 +899,7 @@ class SRC:
         speedrunslive: str = "",
         orderby: Literal["name.int", "name.jap", "signup", "role"] = "name.int",
         direction: Literal["asc", "desc"] = "asc",
+        limit: Optional[int] = None,
     ) -> User | list[User]:
         """Gets a user by ID or list of users based on the arguments
         Args:
@@ -292,15 +917,17 @@ class SRC:
                 signup sorts by signup date\n
                 role sorts by role
             direction: sorts either ascendingly or descendingly
+            limit: maximum number of users to return
         """
         uri = "users"
         if user_id:
             uri += f"/{user_id}"
-            return User(self.get(uri))
+            return User((yield _Call(uri)), self.keep_data)
         payload = {"orderby": orderby, "direction": direction}
         if lookup:
             payload["lookup"] = lookup
-            return [User(u) for u in self.get(uri, payload)]
+            data = yield _Call(uri, payload, limit=limit)
+            return [User(u, self.keep_data) for u in data]
         payload.update(
             {
                 "name": name,
@@ -310,8 +937,10 @@ class SRC:
                 "speedrunslive": speedrunslive,
             }
         )
-        return [User(u) for u in self.get(uri, payload)]
+        data = yield _Call(uri, payload, limit=limit)
+        return [User(u, self.keep_data) for u in data]
 
+    @_endpoint
     def get_user_pbs(
         self,
         user: User,
@@ -329,15 +958,16 @@ class SRC:
             embeds: embed options are the same as the ones for runs
         """
         uri = f"users/{user.id}/personal-bests"
-        if not embeds:
-            embeds = []
-        embeds = ",".join(
-            set(embeds + ["players", "category.variables", "level.variables"])
+        embeds = _join_embeds(
+            embeds, "players", "category.variables", "level.variables"
         )
         payload = {"top": top, "series": series_id, "game": game_id, "embed": embeds}
         payload = {k: v for k, v in payload.items() if v}
-        return UserBoard(self.get(uri, payload), user)
+        return UserBoard(
+            (yield _Call(uri, payload)), user, self.keep_data, self.registry
+        )
 
+    @_endpoint
     def get_leaderboard(
         self,
         game: Game,
@@ -373,9 +1003,7 @@ class SRC:
             uri += f"/level/{level.id}/{category.id}"
         else:
             uri += f"/category/{category.id}"
-        if not embeds:
-            embeds = []
-        embeds = ",".join(set(embeds + ["players"]))
+        embeds = _join_embeds(embeds, "players")
         payload = {
             "top": top,
             "video-only": video_only,
@@ -391,23 +1019,189 @@ class SRC:
         if variables:
             for var in variables:
                 payload[f"var-{var[0].id}"] = var[1]
-        data: dict = self.get(uri, payload)
-        # reinsert players embed inside of each run
-        i = j = 0
-        while i < len(data["runs"]):
-            l = len(data["runs"][i]["run"]["players"])
-            data["runs"][i]["run"]["players"] = {}
-            data["runs"][i]["run"]["players"]["data"] = data["players"]["data"][
-                j : j + l
-            ]
+        data: dict = yield _Call(uri, payload)
+        data = self._reinsert_players(data)
+        return Leaderboard(
+            data, game, category, level, variables, self.keep_data, self.registry
+        )
+
+    def _reinsert_players(self, data: dict) -> dict:
+        """Returns a copy of a leaderboard with its players embed
+        moved inside of each run"""
+        players = data["players"]["data"]
+        runs = []
+        j = 0
+        for place in data["runs"]:
+            l = len(place["run"]["players"])
+            run = dict(place["run"], players={"data": players[j : j + l]})
+            runs.append(dict(place, run=run))
             j += l
-            i += 1
-        data.pop("players")
-        return Leaderboard(data, game, category, level, variables)
+        board = {k: v for k, v in data.items() if k != "players"}
+        board["runs"] = runs
+        return board
+
+    @_endpoint
+    def get_game_records(
+        self,
+        game: Game,
+        top: int = 3,
+        scope: Literal["full-game", "levels", "all"] = "all",
+        misc: bool = True,
+        skip_empty: bool = False,
+        embeds: list[str] = None,
+    ) -> dict[tuple[str, Optional[str], tuple[tuple[str, str], ...]], Leaderboard]:
+        """Gets the top runs of every leaderboard of a game in a few requests.
+        Returns a dict of leaderboards keyed by
+        (category ID, level ID or None, ((variable ID, value ID), ...))
+        Args:
+            game: game whose records to get, fetched again if its categories
+                and levels weren't embedded
+            top: number of places to include for each leaderboard
+            scope: include only full game categories, only levels or both
+            misc: determines if miscellaneous categories are included
+            skip_empty: excludes leaderboards that have no runs
+            embeds: list of resources to embed, players are embedded by default
+                and reinserted into the runs themselves
+        """
+        if not hasattr(game, "categories_by_id") or not hasattr(game, "levels_by_id"):
+            game = yield from SRC.get_game.steps(self, game.id)
+        uri = f"games/{game.id}/records"
+        payload = {
+            "top": top,
+            "scope": scope,
+            "embed": _join_embeds(embeds, "players"),
+        }
+        if not misc:
+            payload["miscellaneous"] = misc
+        # the API's skip-empty sometimes skips boards that do have runs,
+        # so empty boards are always requested and filtered out here instead
+        data: list[dict] = yield _Call(uri, payload)
+        records = {}
+        for board in data:
+            if skip_empty and not board["runs"]:
+                continue
+            board = self._reinsert_players(board)
+            category = game.categories_by_id[board["category"]]
+            level = game.levels_by_id[board["level"]] if board["level"] else None
+            values = tuple(sorted(board["values"].items()))
+            # subcategories of a level can be variables of only that level
+            by_id = self._variables_by_id(category, level)
+            variables = [(by_id[var_id], val_id) for var_id, val_id in values]
+            key = (category.id, board["level"], values)
+            records[key] = Leaderboard(
+                board,
+                game,
+                category,
+                level,
+                variables,
+                self.keep_data,
+                self.registry,
+            )
+        return records
+
+    def _variables_by_id(
+        self, category: Category, level: Optional[Level]
+    ) -> dict[str, Variable]:
+        """Variables of a category and of a level, if any, by ID"""
+        variables = dict(getattr(category, "variables_by_id", {}))
+        if level:
+            for var_id, var in getattr(level, "variables_by_id", {}).items():
+                variables.setdefault(var_id, var)
+        return variables
+
+    def _board_variables(
+        self, category: Category, level: Optional[Level]
+    ) -> list[Variable]:
+        """Returns the subcategory variables that split a specific leaderboard"""
+        board_vars = []
+        for var in self._variables_by_id(category, level).values():
+            scope = var.scope
+            if level:
+                applies = scope.get("type") in ("global", "all-levels") or (
+                    scope.get("type") == "single-level" and scope["level"] == level.id
+                )
+            else:
+                applies = scope.get("type") in ("global", "full-game")
+            if (
+                var.is_subcategory
+                and var.values_by_id
+                and applies
+                and var.category_id in (None, category.id)
+            ):
+                board_vars.append(var)
+        return board_vars
+
+    def _leaderboard_specs(
+        self, game: Game, scope: Literal["full-game", "levels", "all"]
+    ) -> list[tuple[Category, Optional[Level], list[tuple[Variable, str]]]]:
+        """Lists every combination of category, level and subcategory values"""
+        specs = {}
+        for category in game.categories_by_id.values():
+            if category.type == "per-game" and scope != "levels":
+                levels = [None]
+            elif category.type == "per-level" and scope != "full-game":
+                levels = list(game.levels_by_id.values())
+            else:
+                continue
+            for level in levels:
+                board_vars = self._board_variables(category, level)
+                choices = [[(v, val) for val in v.values_by_id] for v in board_vars]
+                for variables in product(*choices):
+                    key = (
+                        category.id,
+                        level.id if level else None,
+                        tuple(sorted((v.id, val) for v, val in variables)),
+                    )
+                    specs[key] = (category, level, list(variables))
+        return list(specs.values())
+
+    def crawl_leaderboards(
+        self,
+        game: Game,
+        top: Optional[int] = None,
+        scope: Literal["full-game", "levels", "all"] = "all",
+        max_workers: int = 8,
+        **board_args,
+    ) -> Iterator[Leaderboard]:
+        """Fetches every leaderboard of a game, one for each combination of
+        category, level and subcategory variable values. Leaderboards are
+        fetched concurrently within the rate limit and yielded as they complete
+        Args:
+            game: game whose leaderboards to get, fetched again if its categories
+                and levels weren't embedded
+            top: number of runs to include in each board, all runs if omitted
+            scope: include only full game categories, only levels or both
+            max_workers: number of leaderboards requested at the same time
+            board_args: any other argument of get_leaderboard
+        """
+        if not hasattr(game, "categories_by_id") or not hasattr(game, "levels_by_id"):
+            game = self.get_game(game.id)
+        specs = self._leaderboard_specs(game, scope)
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = [
+                pool.submit(
+                    # so the workers use the projection of this thread
+                    copy_context().run,
+                    self.get_leaderboard,
+                    game,
+                    category,
+                    level,
+                    top=top,
+                    variables=variables,
+                    **board_args,
+                )
+                for category, level, variables in specs
+            ]
+            try:
+                for future in as_completed(futures):
+                    yield future.result()
+            finally:
+                for future in futures:
+                    future.cancel()
 
     def _run_sort_func(self, run: Run, orderby: str) -> Any:
         if orderby in ["game", "platform", "region"]:
-            comparator = run.__dict__[orderby].id
+            comparator = getattr(run, orderby).id
         elif orderby in ["level", "category"]:
             comparator = run.category_id
             if run.level:
@@ -419,10 +1213,13 @@ class SRC:
             comparator = run.submission_date
         elif orderby == "verify-date":
             comparator = run.verify_date
+        elif orderby == "emulated":
+            comparator = run.is_emulated
         else:
-            comparator = run.__dict__[orderby]
+            comparator = getattr(run, orderby)
         return comparator
 
+    @_endpoint
     def get_runs(
         self,
         run_id: str = None,
@@ -451,6 +1248,7 @@ class SRC:
         direction: Literal["asc", "desc"] = "desc",
         embeds: list[str] = None,
         time_sort: bool = False,
+        limit: Optional[int] = None,
     ) -> Run | list[Run]:
         """Get a run based on ID or a list of runs based on the arguments.
         Obsolete runs are included.
@@ -472,14 +1270,20 @@ class SRC:
             embeds: list of things to embed, players, categories/levels and
                 their variables are embedded by default
             time_sort: sorts by run time in addition to orderby
+            limit: maximum number of runs to return, e.g. the latest 20 submissions
+                with orderby="submitted" only need a single request
         """
         uri = "runs"
-        if embeds is None:
-            embeds = []
-        embeds = ",".join(set(embeds + ["players,category.variables,level.variables"]))
+        embeds = _join_embeds(
+            embeds, "players", "category.variables", "level.variables"
+        )
         if run_id:
             uri += f"/{run_id}"
-            return Run(self.get(uri, {"embed": embeds}))
+            return Run(
+                (yield _Call(uri, {"embed": embeds})),
+                keep_data=self.keep_data,
+                registry=self.registry,
+            )
         payload = {
             "status": status,
             "game": game_id,
@@ -497,8 +1301,8 @@ class SRC:
         payload = {k: v for k, v in payload.items() if v is not None}
         if emulated is not None:
             payload["emulated"] = emulated
-        data = self.get(uri, payload)
-        runs = [Run(r) for r in data]
+        data = yield _Call(uri, payload, limit=limit)
+        runs = [Run(r, keep_data=self.keep_data, registry=self.registry) for r in data]
 
         sorted_runs = []
         if time_sort:
@@ -508,6 +1312,65 @@ class SRC:
             return sorted_runs
         return runs
 
+    def _poll_queue(self, game_id: str) -> list[Run]:
+        # always sent, the queue changes faster than cached responses expire
+        params = {"game": game_id, "status": "new", "orderby": "submitted"}
+        uri, params, _ = self._prepare_get("runs", params, False)
+        return [
+            Run(r, keep_data=self.keep_data, registry=self.registry)
+            for page in self._pages(uri, params)
+            for r in page
+        ]
+
+    def watch_queue(
+        self,
+        game_ids: list[str],
+        callback: Callable[[QueueEvent], Any],
+        interval: float = 30,
+        min_interval: float = 5,
+        max_interval: float = 300,
+        initial: bool = False,
+        max_workers: int = 8,
+        stop: Optional[Event] = None,
+    ):
+        """Polls the verification queues of games and calls callback with a
+        QueueEvent for each run that is submitted or leaves a queue. Games are
+        polled concurrently, each about as often as it gets submissions.
+        A poll that fails is reported as an "error" event and that game is
+        polled again after a backoff. Blocks until stop is set
+        Args:
+            game_ids: IDs of the games to watch
+            interval: seconds between the first polls of a game
+            min_interval: shortest time between polls of a game
+            max_interval: longest time between polls of a game
+            initial: determines if runs already in the queues are reported
+            max_workers: number of queues requested at the same time
+            stop: event that ends the watch
+        """
+        watcher = QueueWatcher(game_ids, interval, min_interval, max_interval, initial)
+        stop = stop if stop is not None else Event()
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            while not stop.is_set():
+                due = watcher.due(time.monotonic())
+                if not due:
+                    stop.wait(watcher.wait(time.monotonic()))
+                    continue
+                futures = {
+                    pool.submit(copy_context().run, self._poll_queue, game_id): game_id
+                    for game_id in due
+                }
+                for future in as_completed(futures):
+                    game_id = futures[future]
+                    try:
+                        runs = future.result()
+                    except Exception as e:
+                        # one failing game doesn't stop the others
+                        callback(watcher.fail(game_id, e, time.monotonic()))
+                        continue
+                    for event in watcher.update(game_id, runs, time.monotonic()):
+                        callback(event)
+
+    @_endpoint
     def change_run_status(
         self, run: Run, status: Literal["verified", "rejected"], reason: str = ""
     ) -> Run:
@@ -523,8 +1386,13 @@ class SRC:
         payload = {"status": {"status": status}}
         if status == "rejected":
             payload["status"]["reason"] = reason
-        return Run(self.put(uri, json=payload))
+        return Run(
+            (yield _Call(uri, method="PUT", json=payload)),
+            keep_data=self.keep_data,
+            registry=self.registry,
+        )
 
+    @_endpoint
     def change_run_players(self, run: Run, players: list[User | Guest]) -> Run:
         """Changes the players of a run
         Args:
@@ -538,8 +1406,13 @@ class SRC:
                 payload["players"].append({"rel": "user", "id": p.id})
             elif isinstance(p, Guest):
                 payload["players"].append({"rel": "guest", "name": p.name})
-        return Run(self.put(uri, json=payload))
+        return Run(
+            (yield _Call(uri, method="PUT", json=payload)),
+            keep_data=self.keep_data,
+            registry=self.registry,
+        )
 
+    @_endpoint
     def submit_run(
         self,
         category_id: str,
@@ -592,19 +1465,25 @@ class SRC:
             }
         }
         payload["run"] = {k: v for k, v in payload["run"].items() if v is not None}
-        return Run(self.post(uri, json=payload))
+        return Run(
+            (yield _Call(uri, method="POST", json=payload)),
+            keep_data=self.keep_data,
+            registry=self.registry,
+        )
 
+    @_endpoint
     def delte_run(self, run_id: str) -> Run:
         """Deletes a run. Requires API Key. You can only delete your own runs,
         unless you're a global mod. May raise an exception with code 500 on success"""
-        uri = f"{API_URL}runs/{run_id}"
-        r = requests.delete(uri, headers=self.headers)
-        if r.status_code >= 400:
-            raise SRCAPIException(r.status_code, uri[len(API_URL) :], r.json())
-        return Run(r.json()["data"])
+        return Run(
+            (yield _Call(f"runs/{run_id}", method="DELETE")),
+            keep_data=self.keep_data,
+            registry=self.registry,
+        )
 
+    @_endpoint
     def get_at_risk_runs(self, user_id: str) -> list[Run]:
-        runs: list[Run] = self.get_runs(user_id=user_id)
+        runs: list[Run] = yield from SRC.get_runs.steps(self, user_id=user_id)
         runs = filter(
             lambda r: r.videos
             and all("twitch.tv" in urlparse(vid).netloc for vid in r.videos),
@@ -612,10 +1491,11 @@ class SRC:
         )
         return list(runs)
 
+    @_endpoint
     def get_at_risk_wrs(self, game_id: str) -> list[Run]:
         """Gets all former World Records that only have Twitch links
         and may be at risk of being deleted"""
-        runs: list[Run] = self.get_runs(game_id=game_id)
+        runs: list[Run] = yield from SRC.get_runs.steps(self, game_id=game_id)
 
         former_wrs: list[Run] = []
         runs.sort(key=lambda r: self._run_sort_func(r, "category"))
@@ -1,6 +1,11 @@
+import hashlib
 from datetime import datetime, timedelta, date
 from collections import defaultdict
-from typing import Optional
+from functools import partial
+from threading import Lock
+from weakref import WeakValueDictionary
+from typing import Optional, Any, Callable
+from . import jsonlib
 
 
 class SRCException(Exception):
@@ -25,10 +30,12 @@ class SRCRunException(SRCAPIException):
 
 
 class SRCType:
+    __slots__ = ("id", "name", "links", "__weakref__")
+
     def __init__(self, data: dict):
         self.id: str = data["id"]
         self.name: str = data["name"]
-        self.links: list[dict[str, str]] = data["links"]
+        self.links: Optional[list[dict[str, str]]] = data.get("links")
 
     def __eq__(self, value: "SRCType"):
         return self.id == value.id
@@ -38,37 +45,51 @@ class SRCType:
 
 
 class Developer(SRCType):
+    __slots__ = ()
+
     def __init__(self, data: dict):
         super().__init__(data)
 
 
 class Publisher(SRCType):
+    __slots__ = ()
+
     def __init__(self, data: dict):
         super().__init__(data)
 
 
 class Genre(SRCType):
+    __slots__ = ()
+
     def __init__(self, data: dict):
         super().__init__(data)
 
 
 class GameType(SRCType):
+    __slots__ = ()
+
     def __init__(self, data: dict):
         super().__init__(data)
 
 
 class Engine(SRCType):
+    __slots__ = ()
+
     def __init__(self, data: dict):
         super().__init__(data)
 
 
 class Platform(SRCType):
+    __slots__ = ("released",)
+
     def __init__(self, data: dict):
         super().__init__(data)
-        self.released: str = data["released"]
+        self.released: Optional[str] = data.get("released")
 
 
 class Region(SRCType):
+    __slots__ = ()
+
     def __init__(self, data: dict):
         super().__init__(data)
 
@@ -84,9 +105,53 @@ TYPES: dict[str, SRCType] = {
 }
 
 
+class Registry:
+    """Identity map of embedded entities, building an entity that was already
+    built from an identical payload returns the existing instance for as long
+    as something still references it, a changed payload builds a new one.
+    Thread safe"""
+
+    def __init__(self):
+        self._entities: WeakValueDictionary[tuple, Any] = WeakValueDictionary()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entities)
+
+    def build(self, cls: type, data: dict, *args) -> Any:
+        # a digest of the whole payload is part of the key so an entity
+        # without embeds, or one that changed since, is never returned
+        digest = hashlib.blake2b(jsonlib.dumps(data), digest_size=16).digest()
+        key = (cls, data["id"], digest)
+        with self._lock:
+            entity = self._entities.get(key)
+            if entity is not None:
+                self.hits += 1
+                return entity
+            self.misses += 1
+        # built outside of the lock since entities build their embeds with it
+        entity = cls(data, *args)
+        with self._lock:
+            return self._entities.setdefault(key, entity)
+
+    def clear(self):
+        with self._lock:
+            self._entities.clear()
+
+
+def _build(registry: Optional[Registry], cls: type, data: dict, *args) -> Any:
+    if registry is None:
+        return cls(data, *args)
+    return registry.build(cls, data, *args)
+
+
 class Series:
-    def __init__(self, data: dict):
-        self.data = data
+    __slots__ = ("data", "id", "name", "abv", "weblink", "created", "moderators")
+
+    def __init__(self, data: dict, keep_data: bool = True):
+        self.data = data if keep_data else None
         self.id: str = data["id"]
         self.name: str = data["names"]["international"]
         self.abv: str = data["abbreviation"]
@@ -96,7 +161,9 @@ class Series:
         if data["created"]:
             self.created = datetime.fromisoformat(data["created"])
         if data["moderators"]["data"]:
-            self.moderators = [Moderator(m) for m in data["moderators"]["data"]]
+            self.moderators = [
+                Moderator(m, keep_data) for m in data["moderators"]["data"]
+            ]
 
     def __repr__(self) -> str:
         rep = f"<Series: {self.name} ({self.id}); moderated by "
@@ -105,27 +172,45 @@ class Series:
 
 
 class User:
-    def __init__(self, data: dict):
-        self.data = data
+    __slots__ = (
+        "data",
+        "id",
+        "name",
+        "pronouns",
+        "country",
+        "weblink",
+        "role",
+        "signupdate",
+        "__weakref__",
+    )
+
+    def __init__(self, data: dict, keep_data: bool = True):
+        self.data = data if keep_data else None
         self.id: str = data["id"]
         self.name: str = data["names"]["international"]
-        self.pronouns: str = data["pronouns"]
-        if data["location"]:
+        self.pronouns: Optional[str] = data.get("pronouns")
+        if data.get("location"):
             self.country: str = data["location"]["country"]["names"]["international"]
-        self.weblink: str = data["weblink"]
-        self.role: str = data["role"]
-        self.signupdate: datetime = datetime.fromisoformat(data["signup"])
+        self.weblink: Optional[str] = data.get("weblink")
+        self.role: Optional[str] = data.get("role")
+        self.signupdate: Optional[datetime] = None
+        if data.get("signup"):
+            self.signupdate = datetime.fromisoformat(data["signup"])
 
     def __repr__(self) -> str:
         return f"<{self.__class__.__name__}: {self.name} ({self.id})>"
 
 
 class Moderator(User):
-    def __init__(self, data: dict):
-        super().__init__(data)
+    __slots__ = ()
+
+    def __init__(self, data: dict, keep_data: bool = True):
+        super().__init__(data, keep_data)
 
 
 class Guest:
+    __slots__ = ("name",)
+
     def __init__(self, data: dict):
         self.name: str = data["name"]
 
@@ -134,6 +219,8 @@ class Guest:
 
 
 class Notification:
+    __slots__ = ("id", "creation_date", "status", "text", "item", "item_link", "links")
+
     def __init__(self, data: dict):
         self.id: str = data["id"]
         self.creation_date: datetime = datetime.fromisoformat(data["created"])
@@ -148,8 +235,24 @@ class Notification:
 
 
 class Variable:
-    def __init__(self, data: dict):
-        self.data = data
+    __slots__ = (
+        "data",
+        "id",
+        "name",
+        "mandatory",
+        "values",
+        "values_by_id",
+        "default_val",
+        "obsoletes",
+        "user_defined",
+        "is_subcategory",
+        "scope",
+        "category_id",
+        "__weakref__",
+    )
+
+    def __init__(self, data: dict, keep_data: bool = True):
+        self.data = data if keep_data else None
         self.id: str = data["id"]
         self.name: str = data["name"]
         self.mandatory: bool = data["mandatory"]
@@ -169,6 +272,8 @@ class Variable:
         self.obsoletes: bool = data["obsoletes"]
         self.user_defined: bool = data["user-defined"]
         self.is_subcategory: bool = data["is-subcategory"]
+        self.scope: dict[str, str] = data.get("scope", {})
+        self.category_id: Optional[str] = data.get("category")
 
     def __eq__(self, value: "Variable"):
         return self.id == value.id
@@ -180,18 +285,38 @@ class Variable:
 
 
 class Level:
-    def __init__(self, data: dict):
-        self.data = data
+    __slots__ = (
+        "data",
+        "id",
+        "name",
+        "weblink",
+        "rules",
+        "categories",
+        "variables",
+        "variables_by_id",
+        "__weakref__",
+    )
+
+    def __init__(
+        self, data: dict, keep_data: bool = True, registry: Optional[Registry] = None
+    ):
+        self.data = data if keep_data else None
         self.id: str = data["id"]
         self.name: str = data["name"]
-        self.weblink: str = data["weblink"]
-        self.rules: str = data["rules"]
+        self.weblink: Optional[str] = data.get("weblink")
+        self.rules: Optional[str] = data.get("rules")
         self.categories: Optional[dict[str, Category]] = None
         if "categories" in data:
-            cats: list[Category] = [Category(c) for c in data["categories"]["data"]]
+            cats: list[Category] = [
+                _build(registry, Category, c, keep_data, registry)
+                for c in data["categories"]["data"]
+            ]
             self.categories = {c.name: c for c in cats}
         if "variables" in data:
-            variables = [Variable(v) for v in data["variables"]["data"]]
+            variables = [
+                _build(registry, Variable, v, keep_data)
+                for v in data["variables"]["data"]
+            ]
             self.variables: dict[str, Variable] = {v.name: v for v in variables}
             self.variables_by_id: dict[str, Variable] = {v.id: v for v in variables}
 
@@ -200,20 +325,44 @@ class Level:
 
 
 class Category:
-    def __init__(self, data: dict):
-        self.data = data
+    __slots__ = (
+        "data",
+        "id",
+        "name",
+        "rules",
+        "weblink",
+        "players",
+        "player_type",
+        "player_number",
+        "game",
+        "variables",
+        "variables_by_id",
+        "type",
+        "misc",
+        "__weakref__",
+    )
+
+    def __init__(
+        self, data: dict, keep_data: bool = True, registry: Optional[Registry] = None
+    ):
+        self.data = data if keep_data else None
         self.id: str = data["id"]
         self.name: str = data["name"]
-        self.rules: str = data["rules"]
-        self.weblink: str = data["weblink"]
+        self.rules: Optional[str] = data.get("rules")
+        self.weblink: Optional[str] = data.get("weblink")
         self.players = data["players"]
         self.player_type = data["players"]["type"]
         self.player_number = data["players"]["value"]
         self.game: Optional[Game] = None
         if "game" in data:
-            self.game: Game = Game(data["game"])
+            self.game: Game = Game(
+                data["game"]["data"], keep_data=keep_data, registry=registry
+            )
         if "variables" in data:
-            variables = [Variable(v) for v in data["variables"]["data"]]
+            variables = [
+                _build(registry, Variable, v, keep_data)
+                for v in data["variables"]["data"]
+            ]
             self.variables: dict[str, Variable] = {v.name: v for v in variables}
             self.variables_by_id: dict[str, Variable] = {v.id: v for v in variables}
         self.type: str = data["type"]
@@ -223,62 +372,207 @@ class Category:
         return f"<Category: {self.name} ({self.id})>"
 
 
+class _lazy:
+    """Attribute decoded from the raw payload on first access and cached in
+    a slot of the same name prefixed with an underscore. Decoders raise
+    AttributeError for fields that aren't present in the payload"""
+
+    def __init__(self, decode: Callable[[Any, dict], Any]):
+        self.decode = decode
+        self.__doc__ = decode.__doc__
+
+    def __set_name__(self, owner: type, name: str):
+        self.name = name
+        # the slot's own descriptor, faster than getattr with the slot's name
+        self.slot = vars(owner)[f"_{name}"]
+
+    def __get__(self, obj: Any, owner: type = None) -> Any:
+        if obj is None:
+            return self
+        try:
+            return self.slot.__get__(obj)
+        except AttributeError:
+            if obj._raw is None:
+                raise AttributeError(self.name) from None
+            value = self.decode(obj, obj._raw)
+            self.slot.__set__(obj, value)
+            return value
+
+    def __set__(self, obj: Any, value: Any):
+        self.slot.__set__(obj, value)
+
+    @staticmethod
+    def decode_all(obj: Any):
+        """Decodes every lazy attribute of an object"""
+        for cls in type(obj).__mro__:
+            for attr in vars(cls).values():
+                if isinstance(attr, _lazy):
+                    try:
+                        attr.__get__(obj)
+                    except AttributeError:
+                        pass
+
+
+def _embedded(data: Optional[dict | list], cls: Callable[[dict], Any]) -> Any:
+    """Builds objects out of an embedded resource, or returns the IDs as is
+    if the resource wasn't embedded"""
+    if data is not None and "data" in data:
+        return [cls(d) for d in data["data"]]
+    return data
+
+
 class Game:
-    def __init__(self, data: dict, bulk: bool = False):
-        self.data = data
+    __slots__ = (
+        "_raw",
+        "data",
+        "id",
+        "name",
+        "abv",
+        "weblink",
+        "bulk",
+        "boosts_received",
+        "distinct_donors",
+        "release_year",
+        "_release_date",
+        "_creation_date",
+        "ruleset",
+        "_categories",
+        "_categories_by_id",
+        "_levels",
+        "_levels_by_id",
+        "_moderators",
+        "_gametypes",
+        "_platforms",
+        "_regions",
+        "_genres",
+        "_engines",
+        "_devs",
+        "_publishers",
+        "_variables",
+        "derived_games",
+        "_registry",
+    )
+
+    def __init__(
+        self,
+        data: dict,
+        bulk: bool = False,
+        keep_data: bool = True,
+        registry: Optional[Registry] = None,
+    ):
+        """Embedded resources and dates are only decoded when first accessed,
+        unless keep_data is False in which case everything is decoded right away.
+        Embedded entities are shared through registry if given"""
+        self._raw = data
+        self._registry = registry
+        self.data = data if keep_data else None
         self.id: str = data["id"]
         self.name: str = data["names"]["international"]
         self.abv: str = data["abbreviation"]
-        self.weblink: str = data["weblink"]
+        self.weblink: Optional[str] = data.get("weblink")
         self.bulk = bulk
-        if bulk:
-            return
-        self.boosts_received: int = data["boostReceived"]
-        self.distinct_donors: int = data["boostDistinctDonors"]
-        self.release_year: str = data["released"]
-        self.release_date: datetime = datetime.fromisoformat(data["release-date"])
-        if data["created"]:
-            self.creation_date: datetime = datetime.fromisoformat(data["created"])
-        self.ruleset: dict = data["ruleset"]
-
-        # --embeds--
-        if "categories" in data:
-            categories = [Category(c) for c in data["categories"]["data"]]
-            self.categories: dict[str, Category] = {c.name: c for c in categories}
-            self.categories_by_id: dict[str, Category] = {c.id: c for c in categories}
-        if "levels" in data:
-            levels = [Level(l) for l in data["levels"]["data"]]
-            self.levels: dict[str, Level] = {l.name: l for l in levels}
-            self.levels_by_id: dict[str, Level] = {l.id: l for l in levels}
-
-        self.moderators: dict[str, str] | list[Moderator] = data["moderators"]
-        self.gametypes: list[str | GameType] = data["gametypes"]
-        self.platforms: list[str | Platform] = data["platforms"]
-        self.regions: list[str | Region] = data["regions"]
-        self.genres: list[str | Genre] = data["genres"]
-        self.engines: list[str | Engine] = data["engines"]
-        self.devs: list[str | Developer] = data["developers"]
-        self.publishers: list[str | Publisher] = data["publishers"]
-        if "data" in data["moderators"]:
-            self.moderators = [Moderator(m) for m in self.moderators["data"]]
-        if "data" in data["gametypes"]:
-            self.gametypes = [GameType(gt) for gt in self.gametypes["data"]]
-        if "data" in data["platforms"]:
-            self.platforms = [Platform(p) for p in self.platforms["data"]]
-        if "data" in data["regions"]:
-            self.regions = [Region(r) for r in self.regions["data"]]
-        if "data" in data["genres"]:
-            self.genres = [Genre(g) for g in self.genres["data"]]
-        if "data" in data["engines"]:
-            self.engines = [Engine(e) for e in self.engines["data"]]
-        if "data" in data["developers"]:
-            self.devs = [Developer(d) for d in self.devs["data"]]
-        if "data" in data["publishers"]:
-            self.publishers = [Publisher(p) for p in self.publishers["data"]]
-        self.variables: Optional[list[Variable]] = None
-        if "variables" in data:
-            self.variables = [Variable(v) for v in data["variables"]["data"]]
         self.derived_games: Optional[list[Game]] = None
+        if not bulk:
+            self.boosts_received: Optional[int] = data.get("boostReceived")
+            self.distinct_donors: Optional[int] = data.get("boostDistinctDonors")
+            self.release_year: Optional[str] = data.get("released")
+            self.ruleset: Optional[dict] = data.get("ruleset")
+        if not keep_data:
+            _lazy.decode_all(self)
+            self._raw = None
+
+    def _full(self, data: dict, key: str) -> Any:
+        # bulk games only have an ID, names, abbreviation and weblink
+        if self.bulk:
+            raise AttributeError(f"{key} is not available in bulk mode")
+        # fields dropped by a projection are None
+        return data.get(key)
+
+    @_lazy
+    def release_date(self, data: dict) -> Optional[datetime]:
+        release_date = self._full(data, "release-date")
+        return datetime.fromisoformat(release_date) if release_date else None
+
+    @_lazy
+    def creation_date(self, data: dict) -> datetime:
+        if not self._full(data, "created"):
+            raise AttributeError("creation_date")
+        return datetime.fromisoformat(data["created"])
+
+    # --embeds--
+    @_lazy
+    def categories_by_id(self, data: dict) -> dict[str, "Category"]:
+        if "categories" not in data or self.bulk:
+            raise AttributeError("categories were not embedded")
+        keep_data = self.data is not None
+        categories = [
+            _build(self._registry, Category, c, keep_data, self._registry)
+            for c in data["categories"]["data"]
+        ]
+        return {c.id: c for c in categories}
+
+    @_lazy
+    def categories(self, data: dict) -> dict[str, "Category"]:
+        return {c.name: c for c in self.categories_by_id.values()}
+
+    @_lazy
+    def levels_by_id(self, data: dict) -> dict[str, "Level"]:
+        if "levels" not in data or self.bulk:
+            raise AttributeError("levels were not embedded")
+        keep_data = self.data is not None
+        levels = [
+            _build(self._registry, Level, l, keep_data, self._registry)
+            for l in data["levels"]["data"]
+        ]
+        return {l.id: l for l in levels}
+
+    @_lazy
+    def levels(self, data: dict) -> dict[str, "Level"]:
+        return {l.name: l for l in self.levels_by_id.values()}
+
+    @_lazy
+    def moderators(self, data: dict) -> dict[str, str] | list[Moderator]:
+        keep_data = self.data is not None
+        moderators = self._full(data, "moderators")
+        return _embedded(moderators, lambda m: Moderator(m, keep_data))
+
+    gametypes: list[str | GameType] = _lazy(
+        lambda self, data: _embedded(self._full(data, "gametypes"), GameType)
+    )
+    platforms: list[str | Platform] = _lazy(
+        lambda self, data: _embedded(
+            self._full(data, "platforms"), partial(_build, self._registry, Platform)
+        )
+    )
+    regions: list[str | Region] = _lazy(
+        lambda self, data: _embedded(
+            self._full(data, "regions"), partial(_build, self._registry, Region)
+        )
+    )
+    genres: list[str | Genre] = _lazy(
+        lambda self, data: _embedded(self._full(data, "genres"), Genre)
+    )
+    engines: list[str | Engine] = _lazy(
+        lambda self, data: _embedded(self._full(data, "engines"), Engine)
+    )
+    devs: list[str | Developer] = _lazy(
+        lambda self, data: _embedded(self._full(data, "developers"), Developer)
+    )
+    publishers: list[str | Publisher] = _lazy(
+        lambda self, data: _embedded(self._full(data, "publishers"), Publisher)
+    )
+
+    @_lazy
+    def variables(self, data: dict) -> Optional[list[Variable]]:
+        if self.bulk:
+            raise AttributeError("variables are not available in bulk mode")
+        if "variables" not in data:
+            return None
+        keep_data = self.data is not None
+        return [
+            _build(self._registry, Variable, v, keep_data)
+            for v in data["variables"]["data"]
+        ]
 
     def __repr__(self) -> str:
         rep = f"<Game: {self.name} "
@@ -288,6 +582,43 @@ class Game:
 
 
 class Run:
+    __slots__ = (
+        "_raw",
+        "data",
+        "id",
+        "weblink",
+        "_game",
+        "game_id",
+        "place",
+        "_variables",
+        "_category",
+        "category_id",
+        "_level",
+        "level_id",
+        "video_text",
+        "videos",
+        "comment",
+        "status",
+        "reason",
+        "_primary_time",
+        "_time",
+        "_realtime",
+        "_ingametime",
+        "_loadremovedtime",
+        "_times",
+        "_date",
+        "_verify_date",
+        "_submission_date",
+        "_players",
+        "_player_ids",
+        "platform_id",
+        "region_id",
+        "_region",
+        "_platform",
+        "is_emulated",
+        "_registry",
+    )
+
     def __init__(
         self,
         data: dict,
@@ -295,21 +626,23 @@ class Run:
         lvl: Level = None,
         players: list[User] = None,
         place: Optional[int] = None,
+        keep_data: bool = True,
+        registry: Optional[Registry] = None,
     ):
-        self.data = data
+        """Only IDs, status, videos and the primary time are decoded right away,
+        everything else is decoded when first accessed
+        unless keep_data is False in which case everything is decoded right away.
+        Embedded entities are shared through registry if given"""
+        self._raw = data
+        self._registry = registry
+        self.data = data if keep_data else None
         self.id: str = data["id"]
-        self.weblink = data["weblink"]
-        self.game: Game = None
+        self.weblink: Optional[str] = data.get("weblink")
         if isinstance(data["game"], str):
             self.game_id: str = data["game"]
         else:
-            self.game = Game(data["game"]["data"])
-            self.game_id = self.game.id
+            self.game_id = data["game"]["data"]["id"]
         self.place = place
-        self.variables: list[tuple[Variable, str]] = []
-        self.category: Optional[Category] = None
-        self.category_id: str = ""
-        self.level: Optional[Level] = None
         self.level_id: Optional[str] = ""
         if lvl:
             self.level = lvl
@@ -317,72 +650,147 @@ class Run:
         elif data["level"] and isinstance(data["level"], str):
             self.level_id = data["level"]
         elif data["level"] and data["level"].get("data"):
-            self.level = Level(data["level"]["data"])
-            self.level_id = self.level.id
+            self.level_id = data["level"]["data"]["id"]
         if cat:
             self.category = cat
-            self.category_id = cat.id
+            self.category_id: str = cat.id
         elif isinstance(data["category"], str):
-            self.category_id: str = data["category"]
+            self.category_id = data["category"]
         else:
-            self.category = Category(data["category"]["data"])
-            self.category_id = self.category.id
-        if self.category:
-            for k, v in data["values"].items():
-                var = self.category.variables_by_id[k]
-                val = var.values_by_id[v]
-                self.variables.append((var, val))
+            self.category_id = data["category"]["data"]["id"]
+        if players:
+            self.players = players
 
         self.video_text: str = ""
         self.videos: Optional[list[str]] = None
-        if data["videos"]:
+        if data.get("videos"):
             self.video_text = data["videos"].get("text", "")
             self.videos = [link["uri"] for link in data["videos"].get("links", [])]
-        self.comment: str = data["comment"]
+        self.comment: Optional[str] = data.get("comment")
         self.status: str = data["status"]["status"]
         if self.status == "rejected":
             self.reason: str = data["status"]["reason"]
-        # --times--
         self._primary_time = timedelta(seconds=data["times"]["primary_t"])
-        self.time: str = self.format_td(self._primary_time)
-        self.realtime: str = None
-        self.ingametime: str = None
-        self.loadremovedtime: str = None
-        if rta := data["times"]["realtime_t"]:
-            self.realtime = self.format_td(timedelta(seconds=rta))
-        if igt := data["times"]["ingame_t"]:
-            self.ingametime = self.format_td(timedelta(seconds=igt))
-        if lrt := data["times"]["realtime_noloads_t"]:
-            self.loadremovedtime = self.format_td(timedelta(seconds=lrt))
-        self.times = {
+        self.platform_id: str = data["system"]["platform"]
+        self.region_id: str = data["system"]["region"]
+        self.is_emulated: bool = data["system"]["emulated"]
+        if not keep_data:
+            _lazy.decode_all(self)
+            self._raw = None
+
+    @_lazy
+    def game(self, data: dict) -> Optional[Game]:
+        if isinstance(data["game"], str):
+            return None
+        keep_data = self.data is not None
+        return Game(data["game"]["data"], keep_data=keep_data, registry=self._registry)
+
+    @_lazy
+    def level(self, data: dict) -> Optional[Level]:
+        if data["level"] and not isinstance(data["level"], str):
+            if data["level"].get("data"):
+                keep_data = self.data is not None
+                lvl = data["level"]["data"]
+                return _build(self._registry, Level, lvl, keep_data, self._registry)
+        return None
+
+    @_lazy
+    def category(self, data: dict) -> Optional[Category]:
+        if isinstance(data["category"], str):
+            return None
+        keep_data = self.data is not None
+        cat = data["category"]["data"]
+        return _build(self._registry, Category, cat, keep_data, self._registry)
+
+    @_lazy
+    def variables(self, data: dict) -> list[tuple[Variable, str]]:
+        variables = []
+        if self.category:
+            for k, v in data["values"].items():
+                var = self.category.variables_by_id[k]
+                val = var.values_by_id[v]
+                variables.append((var, val))
+        return variables
+
+    # --times--
+    @_lazy
+    def time(self, data: dict) -> str:
+        return self.format_td(self._primary_time)
+
+    def _format_time(self, data: dict, timing: str) -> Optional[str]:
+        if t := data["times"][timing]:
+            return self.format_td(timedelta(seconds=t))
+        return None
+
+    realtime: Optional[str] = _lazy(
+        lambda self, data: self._format_time(data, "realtime_t")
+    )
+    ingametime: Optional[str] = _lazy(
+        lambda self, data: self._format_time(data, "ingame_t")
+    )
+    loadremovedtime: Optional[str] = _lazy(
+        lambda self, data: self._format_time(data, "realtime_noloads_t")
+    )
+
+    @_lazy
+    def times(self, data: dict) -> dict[str, Optional[str]]:
+        return {
             "RTA": self.realtime,
             "IGT": self.ingametime,
             "LRT": self.loadremovedtime,
         }
-        # --dates--
-        self.date: date = date.fromisoformat(data["date"])
-        self.verify_date: Optional[datetime] = None
-        self.submission_date: Optional[datetime] = None
+
+    # --dates--
+    @_lazy
+    def date(self, data: dict) -> date:
+        return date.fromisoformat(data["date"])
+
+    @_lazy
+    def verify_date(self, data: dict) -> Optional[datetime]:
         if data["status"].get("verify-date"):
-            self.verify_date = datetime.fromisoformat(data["status"]["verify-date"])
+            return datetime.fromisoformat(data["status"]["verify-date"])
+        return None
+
+    @_lazy
+    def submission_date(self, data: dict) -> Optional[datetime]:
         if data["submitted"]:
-            self.submission_date = datetime.fromisoformat(data["submitted"])
-        # ----
-        self.players: list[User] = None
-        if players:
-            self.players = players
-        elif "data" in data["players"]:
-            self.players = [
-                User(p) if p["rel"] == "user" else Guest(p)
+            return datetime.fromisoformat(data["submitted"])
+        return None
+
+    # ----
+    @_lazy
+    def players(self, data: dict) -> Optional[list[User | Guest]]:
+        if "data" in data["players"]:
+            keep_data = self.data is not None
+            return [
+                (
+                    _build(self._registry, User, p, keep_data)
+                    if p["rel"] == "user"
+                    else Guest(p)
+                )
                 for p in data["players"]["data"]
             ]
-        self.platform_id: str = data["system"]["platform"]
-        self.region_id: str = data["system"]["region"]
-        if "region" in data:
-            self.region = Region(data["region"]["data"])
-        if "platform" in data:
-            self.platform = Platform(data["platform"]["data"])
-        self.is_emulated: bool = data["system"]["emulated"]
+        return None
+
+    @_lazy
+    def player_ids(self, data: dict) -> list[str]:
+        if self.players:
+            return [p.id if isinstance(p, User) else p.name for p in self.players]
+        elif isinstance(data["players"], list):
+            return [p.get("id", p.get("name")) for p in data["players"]]
+        return []
+
+    @_lazy
+    def region(self, data: dict) -> Region:
+        if "region" not in data:
+            raise AttributeError("region was not embedded")
+        return _build(self._registry, Region, data["region"]["data"])
+
+    @_lazy
+    def platform(self, data: dict) -> Platform:
+        if "platform" not in data:
+            raise AttributeError("platform was not embedded")
+        return _build(self._registry, Platform, data["platform"]["data"])
 
     def format_td(self, td: timedelta) -> str:
         hours, remainder = divmod(td.seconds, 3600)
@@ -420,7 +828,7 @@ class Run:
         if self.players:
             players = [n.name for n in self.players]
         else:
-            players = [p["id"] for p in self.data["players"]]
+            players = self.player_ids
         players = ", ".join(players)
         rep += f"by {players} on {self.date}>"
         return rep
@@ -433,6 +841,22 @@ class Run:
 
 
 class Leaderboard:
+    __slots__ = (
+        "data",
+        "game",
+        "category",
+        "level",
+        "vars",
+        "platform",
+        "emulators",
+        "video_only",
+        "timing",
+        "top_runs",
+        "all_variables",
+        "used_regions",
+        "used_platforms",
+    )
+
     def __init__(
         self,
         data: dict,
@@ -440,8 +864,10 @@ class Leaderboard:
         category: Category,
         level: Level = None,
         vars: list[tuple[Variable, str]] = None,
+        keep_data: bool = True,
+        registry: Optional[Registry] = None,
     ):
-        self.data = data
+        self.data = data if keep_data else None
         self.game = game
         self.category = category
         self.level = level
@@ -452,18 +878,33 @@ class Leaderboard:
         self.timing: str = data["timing"]
         self.top_runs: defaultdict[int, list[Run]] = defaultdict(list)
         for run in data["runs"]:
-            self.top_runs[run["place"]].append(Run(run["run"], category, level))
+            self.top_runs[run["place"]].append(
+                Run(
+                    run["run"],
+                    category,
+                    level,
+                    keep_data=keep_data,
+                    registry=registry,
+                )
+            )
         self.top_runs: dict[int, list[Run]] = dict(self.top_runs)
 
         self.all_variables: Optional[list[Variable]] = None
         self.used_regions: Optional[list[Region]] = None
         self.used_platforms: Optional[list[Platform]] = None
         if "variables" in data:
-            self.all_variables = [Variable(v) for v in data["variables"]["data"]]
+            self.all_variables = [
+                _build(registry, Variable, v, keep_data)
+                for v in data["variables"]["data"]
+            ]
         if "regions" in data:
-            self.used_regions = [Region(r) for r in data["regions"]["data"]]
+            self.used_regions = [
+                _build(registry, Region, r) for r in data["regions"]["data"]
+            ]
         if "platforms" in data:
-            self.used_platforms = [Platform(p) for p in data["platforms"]["data"]]
+            self.used_platforms = [
+                _build(registry, Platform, p) for p in data["platforms"]["data"]
+            ]
 
     def wr(self) -> Run:
         if len(self.top_runs[1]) == 1:
@@ -482,22 +923,39 @@ class Leaderboard:
 
 
 class UserBoard:
-    def __init__(self, data: list[dict], user: User):
-        self.data = data
+    __slots__ = ("data", "user", "runs")
+
+    def __init__(
+        self,
+        data: list[dict],
+        user: User,
+        keep_data: bool = True,
+        registry: Optional[Registry] = None,
+    ):
+        self.data = data if keep_data else None
         self.user = user
         self.runs: list[Run] = []
         for pb in data:
-            place: int = pb.pop("place")
-            run_data: dict = pb.pop("run")
-            cat_data: dict = pb.pop("category")["data"]
-            lvl_data: dict = pb.pop("level")["data"]
+            cat_data: dict = pb["category"]["data"]
+            lvl_data: dict = pb["level"]["data"]
             lvl: Level = None
             if lvl_data:
-                lvl = Level(lvl_data)
-            run_data["players"] = pb.pop("players")
+                lvl = _build(registry, Level, lvl_data, keep_data, registry)
+            # the run with the players and other embeds of the personal best
+            run_data = dict(pb["run"])
             for k, v in pb.items():
-                run_data[k] = v
-            self.runs.append(Run(run_data, Category(cat_data), lvl, place=place))
+                if k not in ("place", "run", "category", "level"):
+                    run_data[k] = v
+            self.runs.append(
+                Run(
+                    run_data,
+                    _build(registry, Category, cat_data, keep_data, registry),
+                    lvl,
+                    place=pb["place"],
+                    keep_data=keep_data,
+                    registry=registry,
+                )
+            )
 
     def wrs(self) -> list[Run]:
         return [run for run in self.runs if run.place == 1]
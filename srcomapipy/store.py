@@ -0,0 +1,194 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Optional, Any
+
+# embeds each kind of resource can have and the kind of the embedded resource
+EMBEDS: dict[str, dict[str, str]] = {
+    "games": {
+        "categories": "categories",
+        "levels": "levels",
+        "variables": "variables",
+        "platforms": "platforms",
+        "regions": "regions",
+        "moderators": "users",
+    },
+    "categories": {"game": "games", "variables": "variables"},
+    "levels": {"categories": "categories", "variables": "variables"},
+    "runs": {
+        "game": "games",
+        "category": "categories",
+        "level": "levels",
+        "players": "users",
+        "platform": "platforms",
+        "region": "regions",
+    },
+}
+# kinds of resources that are kept, runs are only taken apart
+KINDS = {"games", "categories", "levels", "variables", "users", "platforms", "regions"}
+# sub resources that are lists of another kind e.g. games/{id}/categories
+SUB_RESOURCES = {
+    "categories": "categories",
+    "levels": "levels",
+    "variables": "variables",
+    "derived-games": "games",
+}
+
+
+def _parse_embeds(embeds: str) -> dict[str, dict]:
+    """Turns "categories.variables,levels" into a tree of embeds"""
+    tree: dict[str, dict] = {}
+    for embed in filter(None, embeds.split(",")):
+        node = tree
+        for part in embed.split("."):
+            node = node.setdefault(part, {})
+    return tree
+
+
+class EntityStore:
+    """Normalized store of the games, categories, levels, variables, users,
+    platforms and regions found in responses, embedded ones included. Each
+    entity is kept once without its embeds, which are kept as references
+    to other entities, so a response can be put back together with any
+    combination of embeds that were seen. Thread safe
+    Args:
+        max_entries: maximum number of entities kept, least recently
+            used ones are dropped first
+        ttl: seconds entities stay fresh when a response doesn't say
+            otherwise, None never expires
+    """
+
+    def __init__(self, max_entries: Optional[int] = 10000, ttl: Optional[float] = 3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # (kind, id) -> [payload without embeds, {embed: (ids, expires)}, expires]
+        self._entities: OrderedDict[tuple[str, str], list] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entities)
+
+    def add_response(self, uri: str, data: Any, ttl: Optional[float] = None):
+        """Takes apart the data of a response and stores its entities
+        Args:
+            uri: the uri the response came from relative to the API url
+            ttl: seconds the entities stay fresh, the store's ttl if None
+        """
+        parts = uri.split("?")[0].split("/")
+        if len(parts) <= 2:
+            kind = parts[0]
+        elif len(parts) == 3:
+            kind = SUB_RESOURCES.get(parts[2], "")
+        else:
+            return
+        if kind not in KINDS and kind != "runs":
+            return
+        ttl = ttl if ttl is not None else self.ttl
+        expires = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            for item in data if isinstance(data, list) else [data]:
+                self._add(kind, item, expires)
+            while self.max_entries is not None and len(self) > self.max_entries:
+                self._entities.popitem(last=False)
+
+    def _add(self, kind: str, data: dict, expires: Optional[float]) -> Optional[str]:
+        embeds: dict[str, tuple[Any, Optional[float]]] = {}
+        payload = {}
+        for k, v in data.items():
+            child_kind = EMBEDS.get(kind, {}).get(k)
+            if child_kind and isinstance(v, dict) and "data" in v:
+                embeds[k] = (
+                    self._add_embedded(child_kind, v["data"], expires),
+                    expires,
+                )
+            else:
+                payload[k] = v
+        if kind == "games":
+            self._link_game(data, embeds, expires)
+        if kind not in KINDS or "id" not in data:
+            return None
+        entry = self._entities.get((kind, data["id"]))
+        if entry is not None:
+            # embeds seen before stay known if this response didn't have them
+            entry[1].update(embeds)
+            embeds = entry[1]
+        self._entities[(kind, data["id"])] = [payload, embeds, expires]
+        self._entities.move_to_end((kind, data["id"]))
+        return data["id"]
+
+    def _add_embedded(
+        self, kind: str, data: dict | list[dict], expires: Optional[float]
+    ) -> Optional[str] | list[str]:
+        if isinstance(data, list):
+            # guests in the players of a run don't have an ID
+            ids = [self._add(kind, d, expires) for d in data if "id" in d]
+            return [i for i in ids if i is not None]
+        return self._add(kind, data, expires) if data else None
+
+    def _link_game(
+        self, data: dict, embeds: dict[str, tuple], expires: Optional[float]
+    ):
+        # categories and levels embedded in a game know their game and
+        # a level's categories are the game's per-level categories
+        cat_ids = embeds.get("categories", (None,))[0]
+        if cat_ids is None:
+            return
+        for cat_id in cat_ids:
+            self._entities[("categories", cat_id)][1]["game"] = (data["id"], expires)
+        if "levels" not in embeds:
+            return
+        per_level = [
+            c
+            for c in cat_ids
+            if self._entities[("categories", c)][0].get("type") == "per-level"
+        ]
+        for lvl_id in embeds["levels"][0]:
+            self._entities[("levels", lvl_id)][1]["categories"] = (per_level, expires)
+
+    def lookup(self, kind: str, id: str, embeds: str = "") -> Optional[dict]:
+        """Returns the entity as the API would with the given embeds,
+        or None if it or any of its embeds isn't stored or isn't fresh"""
+        with self._lock:
+            return self._assemble(kind, id, _parse_embeds(embeds), time.monotonic())
+
+    def _assemble(
+        self, kind: str, id: str, embeds: dict[str, dict], now: float
+    ) -> Optional[dict]:
+        entry = self._entities.get((kind, id))
+        if entry is None or (entry[2] is not None and entry[2] <= now):
+            return None
+        payload, known, _ = entry
+        data = dict(payload)
+        for key, sub_embeds in embeds.items():
+            if key not in known:
+                return None
+            ids, expires = known[key]
+            if expires is not None and expires <= now:
+                return None
+            child_kind = EMBEDS[kind][key]
+            if isinstance(ids, list):
+                children = [self._assemble(child_kind, i, sub_embeds, now) for i in ids]
+                if None in children:
+                    return None
+                data[key] = {"data": children}
+            elif ids is None:
+                data[key] = {"data": []}
+            else:
+                child = self._assemble(child_kind, ids, sub_embeds, now)
+                if child is None:
+                    return None
+                data[key] = {"data": child}
+        self._entities.move_to_end((kind, id))
+        return data
+
+    def invalidate(self, kind: str = ""):
+        """Removes every entity of a kind, or everything if kind is empty"""
+        with self._lock:
+            if not kind:
+                self._entities.clear()
+                return
+            for key in [k for k in self._entities if k[0] == kind]:
+                del self._entities[key]
+
+    def clear(self):
+        self.invalidate()
@@ -0,0 +1,102 @@
+import re
+import json
+import codecs
+from typing import Any, Optional
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# consumed text is dropped from the buffer once it's larger than this
+_TRIM = 1 << 16
+
+
+class StreamParser:
+    """Incremental parser for response bodies that are fed in chunks.
+    Items of the top level "data" array are returned as soon as they're
+    complete, every other top level field is kept in fields, so at most
+    one item and one chunk are held in memory at a time. Bodies whose data
+    isn't an array raise ValueError
+    """
+
+    def __init__(self):
+        self.fields: dict[str, Any] = {}
+        self.done = False
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        self._pos = 0
+        self._state = "start"
+        self._key: Optional[str] = None
+
+    def _decode(self, pos: int) -> Optional[tuple[Any, int]]:
+        try:
+            value, end = self._decoder.raw_decode(self._buf, pos)
+        except json.JSONDecodeError:
+            # most likely the value isn't complete yet
+            return None
+        # a number at the end of the buffer may continue in the next chunk,
+        # the body always has more after a value so it's decoded then
+        if end == len(self._buf):
+            return None
+        return value, end
+
+    def _expect(self, char: str, pos: int):
+        if self._buf[pos] != char:
+            raise ValueError(f"expected {char!r} at {pos} got {self._buf[pos]!r}")
+
+    def feed(self, chunk: bytes) -> list[Any]:
+        """Parses the next chunk of the body, returns the data items it completed"""
+        if self._pos > _TRIM:
+            self._buf = self._buf[self._pos :]
+            self._pos = 0
+        self._buf += self._text.decode(chunk)
+        items = []
+        while not self.done:
+            pos = _WHITESPACE.match(self._buf, self._pos).end()
+            if pos == len(self._buf):
+                break
+            char = self._buf[pos]
+            if self._state == "start":
+                self._expect("{", pos)
+                self._pos, self._state = pos + 1, "key"
+            elif self._state == "key":
+                if char == ",":
+                    self._pos = pos + 1
+                    continue
+                if char == "}":
+                    self._pos, self.done = pos + 1, True
+                    break
+                decoded = self._decode(pos)
+                if decoded is None:
+                    break
+                self._key, self._pos = decoded
+                self._state = "colon"
+            elif self._state == "colon":
+                self._expect(":", pos)
+                self._pos, self._state = pos + 1, "value"
+            elif self._state == "value" and self._key == "data":
+                if char != "[":
+                    raise ValueError("data of the response is not a list of items")
+                self._pos, self._state = pos + 1, "items"
+            elif self._state == "value":
+                decoded = self._decode(pos)
+                if decoded is None:
+                    break
+                self.fields[self._key], self._pos = decoded
+                self._state = "key"
+            elif self._state == "items":
+                if char == ",":
+                    self._pos = pos + 1
+                    continue
+                if char == "]":
+                    self._pos, self._state = pos + 1, "key"
+                    continue
+                decoded = self._decode(pos)
+                if decoded is None:
+                    break
+                item, self._pos = decoded
+                items.append(item)
+        return items
+
+    def close(self):
+        """Checks that the whole body was parsed"""
+        if not self.done:
+            raise ValueError("response body ended before it was complete")
@@ -0,0 +1,291 @@
+import math
+from array import array
+from datetime import date, datetime
+from collections import Counter
+from typing import Optional, Any, Callable, Iterable, Iterator, Sequence
+from .srctypes import Run, Leaderboard, SRCException
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+EPOCH = date(1970, 1, 1).toordinal()
+# value of date columns for runs without that date
+NO_DATE = -(2**31)
+# code of dictionary encoded columns for runs without that value
+NO_VALUE = -1
+
+TIMES = {
+    "primary": "primary_t",
+    "realtime": "realtime_t",
+    "ingametime": "ingame_t",
+    "loadremovedtime": "realtime_noloads_t",
+}
+CODED = ("game", "category", "level", "platform", "region", "status")
+
+
+def _days(value: Optional[str]) -> int:
+    """Days since 1970-01-01 of an ISO date or datetime"""
+    if not value:
+        return NO_DATE
+    return datetime.fromisoformat(value[:10]).toordinal() - EPOCH
+
+
+def _ref(value: Optional[str | dict]) -> Optional[str]:
+    # IDs of resources that may or may not be embedded
+    if isinstance(value, dict):
+        value = value["data"]
+        return value["id"] if value else None
+    return value
+
+
+class Codes:
+    """Dictionary encoded column, each row holds the index of its value
+    in values or NO_VALUE"""
+
+    __slots__ = ("codes", "values", "index")
+
+    def __init__(self, values: Optional[list] = None):
+        self.codes = array("i")
+        self.values: list = list(values or [])
+        self.index: dict[Any, int] = {v: i for i, v in enumerate(self.values)}
+
+    def code(self, value: Any) -> int:
+        if value is None:
+            return NO_VALUE
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def append(self, value: Any):
+        self.codes.append(self.code(value))
+
+    def decode(self) -> list:
+        return [self.values[c] if c != NO_VALUE else None for c in self.codes]
+
+    def take(self, rows: Sequence[int]) -> "Codes":
+        taken = Codes(self.values)
+        codes = self.codes
+        taken.codes = array("i", [codes[r] for r in rows])
+        return taken
+
+
+class RunTable:
+    """Columnar table of runs for analytics over large numbers of runs.
+    Times are float64 seconds with NaN for missing times, dates are int32 days
+    since 1970-01-01 with NO_DATE for missing dates, game, category, level,
+    platform, region, status and subcategory values are dictionary encoded.
+    Columns are arrays that can be exported to NumPy without copying
+    """
+
+    def __init__(self):
+        self.ids: list[str] = []
+        self.place = array("i")
+        self.times: dict[str, array] = {name: array("d") for name in TIMES}
+        self.date = array("i")
+        self.submitted = array("i")
+        self.verified = array("i")
+        self.emulated = array("b")
+        self.coded: dict[str, Codes] = {name: Codes() for name in CODED}
+        # variable ID -> coded value IDs
+        self.variables: dict[str, Codes] = {}
+
+    @classmethod
+    def from_runs(cls, runs: Iterable[dict | Run]) -> "RunTable":
+        table = cls()
+        table.extend(runs)
+        return table
+
+    @classmethod
+    def from_leaderboard(cls, board: Leaderboard) -> "RunTable":
+        if board.data is None:
+            raise SRCException("RunTable needs leaderboards that kept their data")
+        return cls.from_runs(board.data["runs"])
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def extend(self, runs: Iterable[dict | Run]):
+        """Adds runs, either Run objects that kept their data, raw runs
+        or items of a leaderboard which have a place and a run"""
+        for run in runs:
+            self.append(run)
+
+    def append(self, run: dict | Run, place: Optional[int] = None):
+        if isinstance(run, Run):
+            place = run.place
+            run = run.data
+            if run is None:
+                raise SRCException("RunTable needs runs that kept their data")
+        elif "run" in run:
+            place = run["place"]
+            run = run["run"]
+        row = len(self.ids)
+        self.ids.append(run["id"])
+        self.place.append(place or 0)
+        times = run["times"]
+        for name, field in TIMES.items():
+            self.times[name].append(times[field] or math.nan)
+        self.date.append(_days(run["date"]))
+        self.submitted.append(_days(run["submitted"]))
+        self.verified.append(_days(run["status"].get("verify-date")))
+        self.emulated.append(run["system"]["emulated"])
+        coded = self.coded
+        coded["game"].append(_ref(run["game"]))
+        coded["category"].append(_ref(run["category"]))
+        coded["level"].append(_ref(run["level"]))
+        coded["platform"].append(run["system"]["platform"])
+        coded["region"].append(run["system"]["region"])
+        coded["status"].append(run["status"]["status"])
+        for var_id, value in run["values"].items():
+            column = self.variables.get(var_id)
+            if column is None:
+                column = self.variables[var_id] = Codes()
+                column.codes = array("i", [NO_VALUE]) * row
+            column.append(value)
+        for column in self.variables.values():
+            if len(column.codes) == row:
+                column.codes.append(NO_VALUE)
+
+    def column(self, name: str) -> array:
+        """Returns a column by name, the codes of dictionary encoded columns
+        and variable IDs for subcategory values"""
+        if name in self.times:
+            return self.times[name]
+        if name in self.coded:
+            return self.coded[name].codes
+        if name in self.variables:
+            return self.variables[name].codes
+        if name in ("place", "date", "submitted", "verified", "emulated"):
+            return getattr(self, name)
+        raise KeyError(name)
+
+    def values(self, name: str) -> list:
+        """Returns a column with dictionary encoded values decoded"""
+        if name == "id":
+            return list(self.ids)
+        codes = self.coded.get(name) or self.variables.get(name)
+        if codes is not None:
+            return codes.decode()
+        if name in ("date", "submitted", "verified"):
+            return [
+                date.fromordinal(d + EPOCH) if d != NO_DATE else None
+                for d in self.column(name)
+            ]
+        return self.column(name).tolist()
+
+    def _codes(self, name: str) -> Codes:
+        codes = self.coded.get(name) or self.variables.get(name)
+        if codes is None:
+            raise KeyError(name)
+        return codes
+
+    # --operations--
+    def take(self, rows: Sequence[int]) -> "RunTable":
+        """Returns a new table with the given rows in the given order"""
+        table = RunTable()
+        ids = self.ids
+        table.ids = [ids[r] for r in rows]
+        for name in ("place", "date", "submitted", "verified", "emulated"):
+            column = getattr(self, name)
+            setattr(table, name, array(column.typecode, [column[r] for r in rows]))
+        table.times = {
+            name: array("d", [column[r] for r in rows])
+            for name, column in self.times.items()
+        }
+        table.coded = {name: codes.take(rows) for name, codes in self.coded.items()}
+        table.variables = {
+            name: codes.take(rows) for name, codes in self.variables.items()
+        }
+        return table
+
+    def filter(self, mask: Sequence[bool] | Callable[[int], bool]) -> "RunTable":
+        """Returns the rows where mask is true, a sequence with a value per row
+        or a function that is called with each row's index"""
+        if callable(mask):
+            return self.take([r for r in range(len(self)) if mask(r)])
+        return self.take([r for r, keep in enumerate(mask) if keep])
+
+    def where(self, **conditions: Any) -> "RunTable":
+        """Returns the rows whose dictionary encoded columns or variables
+        equal the given values e.g. where(platform="8gej2n93", status="verified")"""
+        rows: Iterable[int] = range(len(self))
+        for name, value in conditions.items():
+            codes = self._codes(name)
+            code = codes.index.get(value, NO_VALUE - 1)
+            column = codes.codes
+            rows = [r for r in rows if column[r] == code]
+        return self.take(list(rows))
+
+    def sort(self, by: str = "primary", reverse: bool = False) -> "RunTable":
+        """Returns the table sorted by a column, missing values go last.
+        Dictionary encoded columns and variables are sorted by value"""
+        column = self.column(by)
+        if column.typecode == "d":
+            is_missing = math.isnan
+        else:
+            is_missing = (NO_DATE, NO_VALUE).__contains__
+        present, absent = [], []
+        for r, value in enumerate(column):
+            (absent if is_missing(value) else present).append(r)
+        key = column.__getitem__
+        if by in self.coded or by in self.variables:
+            # codes are in the order values were first seen
+            values = self._codes(by).values
+            key = lambda r: values[column[r]]
+        present.sort(key=key, reverse=reverse)
+        return self.take(present + absent)
+
+    def group_by(self, name: str) -> dict[Any, "RunTable"]:
+        """Splits the table by the value of a dictionary encoded column,
+        a variable or a date column"""
+        groups: dict[int, list[int]] = {}
+        for r, key in enumerate(self.column(name)):
+            groups.setdefault(key, []).append(r)
+        return {
+            self._decode(name, key): self.take(rows) for key, rows in groups.items()
+        }
+
+    def count_by(self, name: str) -> Counter:
+        """Number of runs per value of a column e.g. count_by("submitted")
+        for submissions per day"""
+        counts = Counter(self.column(name))
+        return Counter({self._decode(name, k): n for k, n in counts.items()})
+
+    def _decode(self, name: str, key: int) -> Any:
+        if name in self.coded or name in self.variables:
+            return self._codes(name).values[key] if key != NO_VALUE else None
+        if name in ("date", "submitted", "verified"):
+            return date.fromordinal(key + EPOCH) if key != NO_DATE else None
+        return key
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.ids)
+
+    # --export--
+    def to_numpy(self, name: Optional[str] = None, copy: bool = False) -> Any:
+        """Returns a column, or a dict of every column if name is omitted,
+        as NumPy arrays sharing memory with the table. Requires numpy.
+        Runs can't be added to the table while a shared array is alive,
+        append raises BufferError, so use copy=True to keep adding runs
+        Args:
+            copy: returns arrays with their own memory instead
+        """
+        if numpy is None:
+            raise SRCException(
+                "RunTable.to_numpy requires numpy, pip install srcomapipy[numpy]"
+            )
+        if name is None:
+            columns = ["place", "date", "submitted", "verified", "emulated"]
+            columns += [*self.times, *self.coded, *self.variables]
+            return {c: self.to_numpy(c, copy) for c in columns}
+        column = self.column(name)
+        dtype = {"d": numpy.float64, "i": numpy.int32, "b": numpy.int8}
+        exported = numpy.frombuffer(column, dtype=dtype[column.typecode])
+        return exported.copy() if copy else exported
+
+    def __repr__(self) -> str:
+        return f"<RunTable: {len(self)} runs>"
@@ -0,0 +1,146 @@
+from datetime import datetime, timezone
+from typing import Optional, Literal, Iterable, NamedTuple
+from .srctypes import Run
+
+# weight of the latest poll in a game's submission rate
+ALPHA = 0.3
+
+
+class QueueEvent(NamedTuple):
+    """A run that was submitted to or left the verification queue of a game,
+    removed runs were verified, rejected or deleted. Polls that failed are
+    "error" events with the exception and no run, the game is polled again
+    after a backoff"""
+
+    kind: Literal["new", "removed", "error"]
+    game_id: str
+    run: Optional[Run]
+    error: Optional[Exception] = None
+
+
+class _Queue:
+    __slots__ = ("runs", "rate", "interval", "polled", "next_poll", "failures")
+
+    def __init__(self, interval: float):
+        self.runs: Optional[dict[str, Run]] = None
+        # submissions per second
+        self.rate = 1 / interval
+        self.interval = interval
+        self.polled: Optional[float] = None
+        self.next_poll = 0.0
+        # polls that failed in a row
+        self.failures = 0
+
+
+class QueueWatcher:
+    """Keeps the verification queues of games and decides when each one is
+    polled next, requests are sent by the client. Each game is polled about
+    as often as it gets submissions, quiet games slow down to max_interval
+    and busy ones speed up to min_interval
+    Args:
+        game_ids: games whose queues are watched
+        interval: seconds between the first polls of a game
+        min_interval: shortest time between polls of a game
+        max_interval: longest time between polls of a game
+        initial: determines if the runs already in a queue when it's first
+            polled are reported as new
+    """
+
+    def __init__(
+        self,
+        game_ids: Iterable[str],
+        interval: float = 30,
+        min_interval: float = 5,
+        max_interval: float = 300,
+        initial: bool = False,
+    ):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.initial = initial
+        self.queues: dict[str, _Queue] = {g: _Queue(interval) for g in game_ids}
+
+    def due(self, now: float) -> list[str]:
+        """Returns the games that should be polled now"""
+        return [g for g, q in self.queues.items() if q.next_poll <= now]
+
+    def wait(self, now: float) -> float:
+        """Returns the seconds until the next game is due"""
+        return max(0.0, min(q.next_poll for q in self.queues.values()) - now)
+
+    def update(self, game_id: str, runs: list[Run], now: float) -> list[QueueEvent]:
+        """Takes the runs of a poll and returns how the queue changed"""
+        queue = self.queues[game_id]
+        current = {run.id: run for run in runs}
+        known = queue.runs
+        events: list[QueueEvent] = []
+        if known is not None or self.initial:
+            known = known or {}
+            events += [
+                QueueEvent("new", game_id, run)
+                for run_id, run in current.items()
+                if run_id not in known
+            ]
+            events += [
+                QueueEvent("removed", game_id, run)
+                for run_id, run in known.items()
+                if run_id not in current
+            ]
+        if queue.runs is not None:
+            added = sum(run_id not in queue.runs for run_id in current)
+            queue.rate += ALPHA * (added / max(now - queue.polled, 1e-3) - queue.rate)
+        queue.runs = current
+        queue.polled = now
+        # aim for about one new submission per poll
+        interval = 1 / queue.rate if queue.rate > 0 else self.max_interval
+        queue.interval = min(max(interval, self.min_interval), self.max_interval)
+        queue.next_poll = now + queue.interval
+        queue.failures = 0
+        return events
+
+    def fail(self, game_id: str, error: Exception, now: float) -> QueueEvent:
+        """Takes a poll that failed, the game's next poll is put off twice as
+        long each time it fails in a row up to max_interval"""
+        queue = self.queues[game_id]
+        queue.failures += 1
+        backoff = queue.interval * 2**queue.failures
+        queue.next_poll = now + min(backoff, self.max_interval)
+        return QueueEvent("error", game_id, None, error)
+
+
+class NotificationCursor:
+    """How far the notifications of a user were read, the creation time of the
+    newest notification seen and the IDs of the ones created at that time.
+    Its attributes are plain strings so it can be saved and restored
+    Args:
+        created: creation time as the API formats it e.g. "2022-01-01T00:00:00Z",
+            everything is new if omitted
+        ids: IDs of the notifications created at that time that were seen
+    """
+
+    __slots__ = ("created", "ids")
+
+    def __init__(self, created: Optional[str] = None, ids: Iterable[str] = ()):
+        self.created = created
+        self.ids: set[str] = set(ids)
+
+    @classmethod
+    def now(cls) -> "NotificationCursor":
+        """A cursor that skips every notification created before now"""
+        return cls(datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"))
+
+    def is_new(self, data: dict) -> bool:
+        if self.created is None or data["created"] > self.created:
+            return True
+        return data["created"] == self.created and data["id"] not in self.ids
+
+    def advance(self, items: list[dict]):
+        """Marks notifications as seen"""
+        for data in items:
+            if self.created is None or data["created"] > self.created:
+                self.created = data["created"]
+                self.ids = {data["id"]}
+            elif data["created"] == self.created:
+                self.ids.add(data["id"])
+
+    def __repr__(self) -> str:
+        return f"<NotificationCursor: {self.created} ({len(self.ids)} seen)>"
@@ -0,0 +1,22 @@
+import pytest
+import srcomapipy.srcomapipy
+import srcomapipy.asyncsrc
+import srcomapipy.mirror
+from . import fakesrc
+
+
+@pytest.fixture(scope="session")
+def api_url():
+    server, url = fakesrc.start()
+    with pytest.MonkeyPatch.context() as mp:
+        for module in (srcomapipy.srcomapipy, srcomapipy.asyncsrc, srcomapipy.mirror):
+            mp.setattr(module, "API_URL", url)
+        yield url
+    server.shutdown()
+
+
+@pytest.fixture
+def fake(api_url):
+    """State of the fake API, reset before each test"""
+    fakesrc.reset()
+    return fakesrc.STATE
@@ -0,0 +1,520 @@
+"""In-process fake of the speedrun.com API that the tests send requests to.
+Games g1-g5 with two categories and two levels each, g1 has 450 runs and
+the others 30. STATE counts the requests, fail queues status codes (or
+seconds to stall) for the next requests and delay slows down endpoints"""
+
+import json, threading, time, gzip
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs, urlencode
+
+STATE = {"count": 0, "paths": [], "fail": [], "delay": {}, "lock": threading.Lock()}
+
+
+def user(i):
+    return {
+        "id": f"u{i}",
+        "names": {"international": f"User{i}"},
+        "pronouns": "",
+        "location": None,
+        "weblink": f"w/u{i}",
+        "role": "user",
+        "signup": "2020-01-01T00:00:00Z",
+        "rel": "user",
+        "links": [],
+    }
+
+
+def var(vid, cat, subcat=True, vals=("A", "B")):
+    return {
+        "id": vid,
+        "name": f"Var{vid}",
+        "category": cat,
+        "mandatory": True,
+        "values": {
+            "values": {f"{vid}{v}": {"label": v} for v in vals},
+            "default": f"{vid}{vals[0]}",
+        },
+        "obsoletes": True,
+        "user-defined": False,
+        "is-subcategory": subcat,
+        "scope": {"type": "global"},
+        "links": [],
+    }
+
+
+def cat(cid, game, per="per-game"):
+    return {
+        "id": cid,
+        "name": f"Cat{cid}",
+        "rules": "rules " * 50,
+        "weblink": f"w/{cid}",
+        "players": {"type": "exactly", "value": 1},
+        "type": per,
+        "miscellaneous": False,
+        "links": [{"rel": "game", "uri": game}],
+    }
+
+
+def game(gid, full=True):
+    g = {
+        "id": gid,
+        "names": {"international": f"Game {gid}"},
+        "abbreviation": gid.lower(),
+        "weblink": f"w/{gid}",
+        "links": [],
+    }
+    if not full:
+        return g
+    g.update(
+        {
+            "boostReceived": 0,
+            "boostDistinctDonors": 0,
+            "released": 2011,
+            "release-date": "2011-10-18",
+            "created": "2015-01-01T00:00:00Z",
+            "ruleset": {"show-milliseconds": True},
+            "moderators": {"u1": "moderator"},
+            "gametypes": [],
+            "platforms": ["p1"],
+            "regions": ["r1"],
+            "genres": [],
+            "engines": [],
+            "developers": [],
+            "publishers": [],
+        }
+    )
+    return g
+
+
+GAMES = {f"g{i}": game(f"g{i}") for i in range(1, 6)}
+CATS = {}
+LVLS = {}
+VARS = {}
+for gid in GAMES:
+    for c in range(2):
+        cid = f"{gid}c{c}"
+        CATS[cid] = cat(cid, gid, "per-game" if c == 0 else "per-level")
+        VARS[f"{cid}v"] = var(f"{cid}v", cid)
+    for l in range(2):
+        lid = f"{gid}l{l}"
+        LVLS[lid] = {
+            "id": lid,
+            "name": f"Lvl{lid}",
+            "weblink": "",
+            "rules": "lr",
+            "links": [],
+            "game": gid,
+        }
+PLATFORMS = {"p1": {"id": "p1", "name": "PC", "released": 1970, "links": []}}
+REGIONS = {"r1": {"id": "r1", "name": "USA", "links": []}}
+USERS = {f"u{i}": user(i) for i in range(1, 30)}
+
+RUNS = []
+for gid in GAMES:
+    n = 450 if gid == "g1" else 30
+    for i in range(n):
+        c = f"{gid}c0" if i % 3 else f"{gid}c1"
+        lvl = f"{gid}l{i % 2}" if c.endswith("c1") else None
+        status = "new" if i % 10 == 0 else ("rejected" if i % 17 == 0 else "verified")
+        st = {"status": status}
+        if status == "verified":
+            st["verify-date"] = f"2021-01-{(i % 28) + 1:02}T00:00:00Z"
+        if status == "rejected":
+            st["reason"] = "bad"
+        RUNS.append(
+            {
+                "id": f"{gid}r{i}",
+                "weblink": "",
+                "game": gid,
+                "level": lvl,
+                "category": c,
+                "values": {f"{c}v": f"{c}v{'A' if i % 2 else 'B'}"},
+                "videos": {"links": [{"uri": "https://twitch.tv/x"}]},
+                "comment": "",
+                "status": st,
+                "times": {
+                    "primary_t": 100 + i,
+                    "realtime_t": 100 + i,
+                    "ingame_t": 0,
+                    "realtime_noloads_t": 0,
+                },
+                "date": "2020-05-05",
+                "submitted": f"2020-{(i % 12) + 1:02}-01T00:00:{i % 60:02}Z",
+                "players": [{"rel": "user", "id": f"u{(i % 29) + 1}"}],
+                "system": {"platform": "p1", "region": "r1", "emulated": False},
+                "links": [],
+            }
+        )
+NOTIFS = [
+    {
+        "id": f"n{i}",
+        "created": f"2022-01-01T00:{i // 60:02}:{i % 60:02}Z",
+        "status": "read",
+        "text": f"note {i}",
+        "item": {"rel": "run", "link": "x"},
+        "links": [],
+    }
+    for i in range(250)
+]
+
+
+def embed_cat(cid, embeds):
+    c = dict(CATS[cid])
+    if (
+        "variables" in embeds
+        or "category.variables" in embeds
+        or "categories.variables" in embeds
+    ):
+        c["variables"] = {"data": [VARS[f"{cid}v"]]}
+    return c
+
+
+def embed_game(gid, embeds):
+    g = dict(GAMES[gid])
+    if any(e.startswith("categories") for e in embeds):
+        g["categories"] = {
+            "data": [embed_cat(c, embeds) for c in CATS if c.startswith(gid + "c")]
+        }
+    if any(e.startswith("levels") for e in embeds):
+        lv = []
+        for l in LVLS:
+            if l.startswith(gid + "l"):
+                d = dict(LVLS[l])
+                if "levels.variables" in embeds:
+                    d["variables"] = {"data": []}
+                lv.append(d)
+        g["levels"] = {"data": lv}
+    if "platforms" in embeds:
+        g["platforms"] = {"data": list(PLATFORMS.values())}
+    if "moderators" in embeds:
+        g["moderators"] = {"data": [USERS[u] for u in g["moderators"]]}
+    return g
+
+
+def embed_run(r, embeds):
+    r = dict(r)
+    if "players" in embeds:
+        r["players"] = {"data": [USERS[p["id"]] for p in r["players"]]}
+    if "category.variables" in embeds or "category" in embeds:
+        r["category"] = {"data": embed_cat(r["category"], embeds)}
+    if r["level"] and ("level.variables" in embeds or "level" in embeds):
+        l = dict(LVLS[r["level"]])
+        l["variables"] = {"data": []}
+        r["level"] = {"data": l}
+    elif "level" in embeds or "level.variables" in embeds:
+        r["level"] = {"data": []}
+    if "platform" in embeds:
+        r["platform"] = {"data": PLATFORMS["p1"]}
+    if "region" in embeds:
+        r["region"] = {"data": REGIONS["r1"]}
+    if "game" in embeds:
+        r["game"] = {"data": GAMES[r["game"]]}
+    return r
+
+
+class H(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *a):
+        pass
+
+    def send(self, code, body):
+        raw = json.dumps(body).encode()
+        if "gzip" in self.headers.get("Accept-Encoding", "") and len(raw) > 1000:
+            raw = gzip.compress(raw)
+            enc = True
+        else:
+            enc = False
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        if enc:
+            self.send_header("Content-Encoding", "gzip")
+        if code in (420, 429):
+            self.send_header("Retry-After", "0.2")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def err(self, code, msg="err"):
+        self.send(code, {"status": code, "message": msg, "links": []})
+
+    def page(self, items, q, path):
+        off = int(q.get("offset", ["0"])[0])
+        mx = int(q.get("max", ["20"])[0])
+        chunk = items[off : off + mx]
+        links = []
+        base = f"http://{self.headers['Host']}{path}"
+        if off > 0:
+            qq = {k: v[0] for k, v in q.items()}
+            qq["offset"] = max(0, off - mx)
+            links.append({"rel": "prev", "uri": base + "?" + urlencode(qq)})
+        if off + mx < len(items):
+            qq = {k: v[0] for k, v in q.items()}
+            qq["offset"] = off + mx
+            links.append({"rel": "next", "uri": base + "?" + urlencode(qq)})
+        return {
+            "data": chunk,
+            "pagination": {
+                "offset": off,
+                "max": mx,
+                "size": len(chunk),
+                "links": links,
+            },
+        }
+
+    def handle_any(self, method):
+        u = urlparse(self.path)
+        path = u.path
+        q = parse_qs(u.query, keep_blank_values=True)
+        with STATE["lock"]:
+            STATE["count"] += 1
+            STATE["paths"].append((method, self.path))
+            fail = STATE["fail"].pop(0) if STATE["fail"] else None
+        if fail:
+            if isinstance(fail, (int, float)) and fail < 100:
+                time.sleep(fail)
+            else:
+                return self.err(fail)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+        p = path.split("/api/v1/", 1)[1]
+        embeds = q.get("embed", [""])[0].split(",")
+        parts = p.split("/")
+        d = STATE["delay"].get(parts[0])
+        if d:
+            time.sleep(d)
+        if parts[0] == "games" and len(parts) == 1:
+            bulk = ("id", "names", "abbreviation", "weblink")
+            items = [
+                (
+                    embed_game(g, embeds)
+                    if not q.get("_bulk")
+                    else {k: GAMES[g][k] for k in bulk}
+                )
+                for g in GAMES
+            ]
+            if "name" in q:
+                items = [
+                    g
+                    for g in items
+                    if q["name"][0].lower() in g["names"]["international"].lower()
+                ]
+            return self.send(200, self.page(items, q, path))
+        if parts[0] == "games" and len(parts) == 2:
+            if parts[1] not in GAMES:
+                return self.err(404, "not found")
+            return self.send(200, {"data": embed_game(parts[1], embeds)})
+        if parts[0] == "games" and parts[2] == "derived-games":
+            return self.send(200, self.page([], q, path))
+        if parts[0] == "games" and parts[2] == "records":
+            gid = parts[1]
+            top = int(q.get("top", ["3"])[0])
+            boards = []
+            for c in CATS:
+                if not c.startswith(gid + "c"):
+                    continue
+                lvls = (
+                    [None]
+                    if CATS[c]["type"] == "per-game"
+                    else [l for l in LVLS if l.startswith(gid + "l")]
+                )
+                for l in lvls:
+                    rs = [
+                        r
+                        for r in RUNS
+                        if r["category"] == c
+                        and r["level"] == l
+                        and r["status"]["status"] == "verified"
+                    ]
+                    rs.sort(key=lambda r: r["times"]["primary_t"])
+                    boards.append(
+                        {
+                            "weblink": "",
+                            "game": gid,
+                            "category": c,
+                            "level": l,
+                            "platform": None,
+                            "region": None,
+                            "emulators": None,
+                            "video-only": False,
+                            "timing": "realtime",
+                            "values": {},
+                            "runs": [
+                                {"place": i + 1, "run": embed_run(r, [])}
+                                for i, r in enumerate(rs[:top])
+                            ],
+                            "players": (
+                                {
+                                    "data": [
+                                        USERS[p["id"]]
+                                        for r in rs[:top]
+                                        for p in r["players"]
+                                    ]
+                                }
+                                if "players" in embeds
+                                else None
+                            ),
+                            "links": [],
+                        }
+                    )
+                    if "players" not in embeds:
+                        boards[-1].pop("players")
+            return self.send(200, self.page(boards, q, path))
+        if parts[0] == "categories":
+            c = embed_cat(parts[1], embeds)
+            if "game" in embeds:
+                c["game"] = {"data": GAMES[parts[1].split("c")[0]]}
+            return self.send(200, {"data": c})
+        if parts[0] == "levels":
+            return self.send(200, {"data": LVLS[parts[1]]})
+        if parts[0] == "variables":
+            return self.send(200, {"data": VARS[parts[1]]})
+        if parts[0] == "platforms":
+            if len(parts) == 2:
+                return self.send(200, {"data": PLATFORMS[parts[1]]})
+            return self.send(200, self.page(list(PLATFORMS.values()), q, path))
+        if parts[0] == "runs":
+            if method == "POST":
+                r = dict(RUNS[0])
+                r["id"] = "newrun"
+                return self.send(201, {"data": r})
+            if len(parts) == 1:
+                rs = list(RUNS)
+                for k in ("game", "category", "level"):
+                    if k in q:
+                        rs = [r for r in rs if r[k] == q[k][0]]
+                if "status" in q:
+                    rs = [r for r in rs if r["status"]["status"] == q["status"][0]]
+                if "user" in q:
+                    rs = [
+                        r
+                        for r in rs
+                        if any(p.get("id") == q["user"][0] for p in r["players"])
+                    ]
+                ob = q.get("orderby", ["game"])[0]
+                rev = q.get("direction", ["asc"])[0] == "desc"
+                if ob == "submitted":
+                    rs.sort(key=lambda r: r["submitted"], reverse=rev)
+                elif ob == "verify-date":
+                    rs.sort(
+                        key=lambda r: r["status"].get("verify-date") or "", reverse=rev
+                    )
+                items = [embed_run(r, embeds) for r in rs]
+                return self.send(200, self.page(items, q, path))
+            r = next((r for r in RUNS if r["id"] == parts[1]), None)
+            if r is None:
+                return self.err(404, "no run")
+            if method == "PUT" and parts[2] == "status":
+                r = dict(r)
+                r["status"] = {
+                    "status": body["status"]["status"],
+                    "reason": body["status"].get("reason", ""),
+                }
+                return self.send(200, {"data": r})
+            if method == "DELETE":
+                return self.send(200, {"data": r})
+            return self.send(200, {"data": embed_run(r, embeds)})
+        if parts[0] == "leaderboards":
+            gid = parts[1]
+            if parts[2] == "level":
+                lid, cid = parts[3], parts[4]
+            else:
+                lid, cid = None, parts[3]
+            rs = [
+                r
+                for r in RUNS
+                if r["category"] == cid
+                and r["level"] == lid
+                and r["status"]["status"] == "verified"
+            ]
+            for k, v in q.items():
+                if k.startswith("var-"):
+                    rs = [r for r in rs if r["values"].get(k[4:]) == v[0]]
+            rs.sort(key=lambda r: r["times"]["primary_t"])
+            top = int(q.get("top", ["1000"])[0])
+            rs = rs[:top]
+            data = {
+                "weblink": "",
+                "game": gid,
+                "category": cid,
+                "level": lid,
+                "platform": None,
+                "region": None,
+                "emulators": None,
+                "video-only": False,
+                "timing": "realtime",
+                "values": {k[4:]: v[0] for k, v in q.items() if k.startswith("var-")},
+                "runs": [
+                    {"place": i + 1, "run": embed_run(r, [])} for i, r in enumerate(rs)
+                ],
+                "links": [],
+            }
+            if "players" in embeds:
+                data["players"] = {
+                    "data": [USERS[p["id"]] for r in rs for p in r["players"]]
+                }
+            return self.send(200, {"data": data})
+        if parts[0] == "users":
+            if len(parts) == 1:
+                return self.send(200, self.page(list(USERS.values()), q, path))
+            if len(parts) == 2:
+                return self.send(200, {"data": USERS[parts[1]]})
+            uid = parts[1]
+            pbs = []
+            for r in RUNS:
+                if r["players"][0]["id"] == uid and r["status"]["status"] == "verified":
+                    rr = dict(r)
+                    rr["players"] = r["players"]
+                    lvl = (
+                        {"data": dict(LVLS[r["level"]], variables={"data": []})}
+                        if r["level"]
+                        else {"data": []}
+                    )
+                    pbs.append(
+                        {
+                            "place": 1,
+                            "run": rr,
+                            "category": {
+                                "data": embed_cat(r["category"], ["category.variables"])
+                            },
+                            "level": lvl,
+                            "players": {"data": [USERS[uid]]},
+                        }
+                    )
+            return self.send(200, {"data": pbs[:10]})
+        if parts[0] == "notifications":
+            items = list(NOTIFS)
+            if q.get("direction", ["desc"])[0] == "desc":
+                items.reverse()
+            return self.send(200, self.page(items, q, path))
+        if parts[0] == "profile":
+            return self.send(200, {"data": USERS["u1"]})
+        return self.err(404, "unknown " + p)
+
+    def do_GET(self):
+        self.handle_any("GET")
+
+    def do_PUT(self):
+        self.handle_any("PUT")
+
+    def do_POST(self):
+        self.handle_any("POST")
+
+    def do_DELETE(self):
+        self.handle_any("DELETE")
+
+
+def start() -> tuple[ThreadingHTTPServer, str]:
+    """Serves the fake API on a free port, returns the server and its API url"""
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), H)
+    srv.daemon_threads = True
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv, f"http://127.0.0.1:{srv.server_address[1]}/api/v1/"
+
+
+def reset():
+    with STATE["lock"]:
+        STATE["count"] = 0
+        STATE["paths"].clear()
+        STATE["fail"].clear()
+        STATE["delay"].clear()
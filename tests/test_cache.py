@@ -0,0 +1,161 @@
+import json
+import time
+import pytest
+from srcomapipy.srcomapipy import SRC
+from srcomapipy.cache import MemoryCache, FrozenDict, FrozenList
+
+
+@pytest.fixture
+def api(fake):
+    with SRC() as api:
+        yield api
+
+
+def test_leaderboard_cache_hit(fake, api):
+    game = api.get_game("g1")
+    category = game.categories["Catg1c0"]
+    first = api.get_leaderboard(game, category, top=5)
+    requests = len(fake["paths"])
+    second = api.get_leaderboard(game, category, top=5)
+    assert len(fake["paths"]) == requests
+    assert second.data == first.data
+    assert api.stats()["cache"]["hits"] >= 1
+
+
+def test_user_board_cache_hit(fake, api):
+    user = api.get_users("u2")
+    first = api.get_user_pbs(user)
+    requests = len(fake["paths"])
+    second = api.get_user_pbs(user)
+    assert len(fake["paths"]) == requests
+    assert [r.id for r in second.runs] == [r.id for r in first.runs]
+
+
+def test_ttls():
+    cache = MemoryCache()
+    assert cache.ttl_for("platforms") == 86400
+    assert cache.ttl_for("runs", {"status": "new"}) == 15
+    assert cache.ttl_for("games/g1/records") == 600
+    assert cache.ttl_for("users/u1/personal-bests") == 600
+    assert cache.ttl_for("games/g1") is None
+
+
+def test_expired_responses_are_requested_again(fake):
+    with SRC(cache=MemoryCache(ttls={"users": 0.05})) as api:
+        api.get_users("u2")
+        api.get_users("u2")
+        assert len(fake["paths"]) == 1
+        time.sleep(0.1)
+        api.get_users("u2")
+    assert len(fake["paths"]) == 2
+
+
+def test_lru_eviction(fake):
+    with SRC(cache=MemoryCache(max_entries=2)) as api:
+        for user_id in ("u1", "u2", "u3", "u1"):
+            api.get_users(user_id)
+    assert len(fake["paths"]) == 4
+
+
+def test_writes_invalidate_leaderboards(fake, api):
+    game = api.get_game("g1")
+    category = game.categories["Catg1c0"]
+    board = api.get_leaderboard(game, category, top=5)
+    api.get_user_pbs(api.get_users("u2"))
+    run = api.get_runs(run_id=board.data["runs"][0]["run"]["id"])
+    api.change_run_status(run, "rejected", "bad")
+    requests = len(fake["paths"])
+    api.get_leaderboard(game, category, top=5)
+    api.get_user_pbs(api.get_users("u2"))
+    api.get_game("g1")
+    # the leaderboard and personal bests, the game and user are still cached
+    assert len(fake["paths"]) == requests + 2
+
+
+def test_cached_responses_are_frozen(api):
+    game = api.get_game("g1")
+    board = api.get_leaderboard(game, game.categories["Catg1c0"], top=5)
+    pbs = api.get_user_pbs(api.get_users("u2"))
+    (key,) = api.cache.keys("leaderboards/g1/category/g1c0")
+    cached = api.cache.get(key)
+    assert isinstance(cached, FrozenDict)
+    assert isinstance(cached["runs"], FrozenList)
+    # players are moved into a copy of the board, the runs are shared
+    assert isinstance(board.data["runs"][0]["run"]["times"], FrozenDict)
+    assert isinstance(pbs.data, FrozenList)
+    with pytest.raises(TypeError):
+        cached["runs"].append({})
+    with pytest.raises(TypeError):
+        pbs.data[0]["place"] = 2
+
+
+def test_parsing_leaves_cached_responses_alone(api):
+    runs = api.get_runs(game_id="g2", embeds=["players", "category.variables"])
+    (key,) = api.cache.keys("runs")
+    before = json.dumps(api.cache.get(key))
+    for run in runs:
+        run.players, run.category, run.variables, run.times
+    assert json.dumps(api.cache.get(key)) == before
+
+
+def _params(params: dict, embeds: list[str]) -> dict:
+    return dict(params, embed=",".join(embeds)) if embeds else dict(params)
+
+
+def _live(uri: str, params: dict, embeds: list[str]):
+    """Response of a request that isn't served from any cache"""
+    with SRC(cache=MemoryCache(max_entries=0)) as api:
+        uri, params, _ = api._prepare_get(uri, _params(params, embeds), False)
+        pages = list(api._pages(uri, params))
+    return pages[0] if isinstance(pages[0], dict) else sum(pages, [])
+
+
+def _stripped(api: SRC, uri: str, params: dict, embeds: list[str]):
+    """Response of a request served from a cached response with more embeds"""
+    _, _, key = api._prepare_get(uri, _params(params, embeds), False)
+    assert api.cache.get(key) is None
+    return api.cache.get_embedded(key)
+
+
+RUN_EMBEDS = ["players", "category.variables", "level.variables", "game", "platform"]
+GAME_EMBEDS = ["categories.variables", "levels.variables", "platforms", "moderators"]
+
+
+@pytest.mark.parametrize(
+    "embeds", [[], ["players"], ["category"], ["players", "category.variables"]]
+)
+def test_runs_with_fewer_embeds(fake, api, embeds):
+    params = {"game": "g2"}
+    api.get("runs", _params(params, RUN_EMBEDS))
+    assert _stripped(api, "runs", params, embeds) == _live("runs", params, embeds)
+
+
+@pytest.mark.parametrize("embeds", [[], ["categories"], ["levels.variables"]])
+def test_game_with_fewer_embeds(fake, api, embeds):
+    api.get("games/g1", _params({}, GAME_EMBEDS))
+    stripped = _stripped(api, "games/g1", {}, embeds)
+    live = _live("games/g1", {}, embeds)
+    # moderators can't be turned back into the un-embedded form, they're kept
+    assert stripped["moderators"]["data"][0]["id"] == "u1"
+    assert live["moderators"] == {"u1": "moderator"}
+    assert stripped["platforms"] == live["platforms"] == ["p1"]
+    assert dict(stripped, moderators=None) == dict(live, moderators=None)
+
+
+def test_requests_are_served_from_wider_responses(fake, api):
+    api.get_runs(game_id="g2", embeds=["category.variables", "level"])
+    requests = len(fake["paths"])
+    api.get_runs(game_id="g2", embeds=["category"])
+    api.get_runs(game_id="g2", embeds=[])
+    assert len(fake["paths"]) == requests
+
+
+def test_upgrade_embeds_widens_once(fake):
+    with SRC(cache=MemoryCache(upgrade_embeds=True)) as api:
+        api.get_runs(game_id="g2", embeds=["platform"])
+        api.get_runs(game_id="g2", embeds=["region"])
+        assert len(fake["paths"]) == 2
+        assert "platform" in fake["paths"][1][1] and "region" in fake["paths"][1][1]
+        for embeds in (["platform"], ["region"], ["region", "platform"], []):
+            api.get_runs(game_id="g2", embeds=embeds)
+    assert len(fake["paths"]) == 2
@@ -0,0 +1,79 @@
+import pytest
+from srcomapipy.srcomapipy import SRC
+from srcomapipy.catalog import GameIndex
+from . import fakesrc
+
+NAMES = {
+    "sm64": "Super Mario 64",
+    "sms": "Super Mario Sunshine",
+    "pkmnred": "Pokémon Red",
+    "oot": "The Legend of Zelda: Ocarina of Time",
+    "celeste": "Celeste",
+}
+
+
+def _game(i: int, abv: str, name: str) -> dict:
+    data = fakesrc.game(f"x{i}", False)
+    return dict(data, names={"international": name, "japanese": None}, abbreviation=abv)
+
+
+@pytest.fixture
+def catalog(fake, monkeypatch):
+    # newest first, like the API ordered by creation date
+    games = [_game(i, abv, name) for i, (abv, name) in enumerate(NAMES.items())]
+    games += [_game(i, f"filler{i}", f"Filler Game {i}") for i in range(10, 2500)]
+    monkeypatch.setattr(fakesrc, "GAMES", {g["id"]: g for g in games})
+    with SRC() as api:
+        index = GameIndex(api)
+        index.update()
+        yield index
+
+
+def test_update(catalog, fake, monkeypatch):
+    assert len(catalog) == 2495
+    # 1000 games per page
+    assert len(fake["paths"]) == 3
+    fakesrc.reset()
+    assert catalog.update() == 0
+    assert len(fake["paths"]) == 1
+    new = dict(_game(1, "new", "New Game"), id="y1")
+    monkeypatch.setattr(fakesrc, "GAMES", {new["id"]: new, **fakesrc.GAMES})
+    assert catalog.update() == 1
+    assert len(fake["paths"]) == 2
+    assert catalog.by_abbreviation("new").name == "New Game"
+    fakesrc.reset()
+    assert catalog.update(full=True) == 0
+    assert len(fake["paths"]) == 3
+
+
+def test_lookups(catalog):
+    assert catalog.by_abbreviation("SM64").name == "Super Mario 64"
+    assert catalog.by_abbreviation("nope") is None
+    assert [g.abv for g in catalog.by_name("pokemon red")] == ["pkmnred"]
+    assert catalog.get("x4").name == "Celeste"
+    assert "x4" in catalog and "y4" not in catalog
+
+
+def test_prefix(catalog):
+    assert [g.abv for g in catalog.prefix("super")] == ["sm64", "sms"]
+    assert [g.abv for g in catalog.prefix("Poke")] == ["pkmnred"]
+    assert len(catalog.prefix("filler game", limit=5)) == 5
+
+
+def test_search(catalog):
+    assert catalog.search("super maro 64")[0].abv == "sm64"
+    assert catalog.search("ocarina of tme")[0].abv == "oot"
+    assert catalog.search("celest")[0].abv == "celeste"
+    assert catalog.resolve("OOT").abv == "oot"
+    assert catalog.resolve("Super Mario Sunshine").abv == "sms"
+
+
+def test_save_and_load(catalog, fake, tmp_path):
+    path = tmp_path / "games.json"
+    catalog.save(str(path))
+    loaded = GameIndex(catalog.api, str(path))
+    assert len(loaded) == len(catalog)
+    assert loaded.resolve("super maro 64").abv == "sm64"
+    fakesrc.reset()
+    assert loaded.update() == 0
+    assert len(fake["paths"]) == 1
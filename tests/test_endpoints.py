@@ -0,0 +1,46 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from srcomapipy.srcomapipy import SRC
+from srcomapipy.asyncsrc import AsyncSRC
+
+# endpoint calls that are sent through both clients, they take the client and
+# objects requested through the sync client: game g1 and user u2
+CALLS = {
+    "get_game": lambda api, o: api.get_game("g1"),
+    "search_game": lambda api, o: api.search_game("Game"),
+    "search_game bulk": lambda api, o: api.search_game("Game", bulk=True),
+    "get_category": lambda api, o: api.get_category("g2c0"),
+    "get_level": lambda api, o: api.get_level("g2l1"),
+    "get_variable": lambda api, o: api.get_variable("g2c0v"),
+    "get_runs": lambda api, o: api.get_runs(game_id="g2"),
+    "get_runs run_id": lambda api, o: api.get_runs(run_id="g2r3"),
+    "get_runs limit": lambda api, o: api.get_runs(game_id="g1", limit=250),
+    "get_leaderboard": lambda api, o: api.get_leaderboard(
+        o.game, o.game.categories["Catg1c1"], o.game.levels["Lvlg1l0"], top=5
+    ),
+    "get_user_pbs": lambda api, o: api.get_user_pbs(o.user),
+    "get_game_records": lambda api, o: api.get_game_records(o.game, top=2),
+}
+
+
+def _data(result):
+    """Raw data of whatever an endpoint returned, to compare the clients"""
+    if isinstance(result, dict):
+        return {k: _data(v) for k, v in result.items()}
+    if isinstance(result, list):
+        return [_data(r) for r in result]
+    return result.data
+
+
+@pytest.mark.parametrize("name", CALLS)
+def test_async_matches_sync(fake, name):
+    with SRC() as api:
+        objects = SimpleNamespace(game=api.get_game("g1"), user=api.get_users("u2"))
+        expected = _data(CALLS[name](api, objects))
+
+    async def main():
+        async with AsyncSRC() as api:
+            return await CALLS[name](api, objects)
+
+    assert _data(asyncio.run(main())) == expected
@@ -0,0 +1,51 @@
+import asyncio
+import time
+from srcomapipy.srcomapipy import SRC
+from srcomapipy.asyncsrc import AsyncSRC
+from srcomapipy.ratelimit import RateLimiter
+
+
+def test_stalled_request_is_hedged(fake):
+    fake["fail"] += [1.0]
+    with SRC(hedge_after=0.1) as api:
+        start = time.perf_counter()
+        api.get_users("u2")
+        assert time.perf_counter() - start < 0.9
+        assert api.stats()["hedged"] == 1
+        assert api.stats()["hedge_wins"] == 1
+    assert len(fake["paths"]) == 2
+
+
+def test_no_hedge_while_rate_limited(fake):
+    limiter = RateLimiter(4, 1, burst=1)
+    with SRC(hedge_after=0.1, rate_limiter=limiter) as api:
+        for i in range(1, 7):
+            api.get_users(f"u{i}")
+        assert api.stats().get("hedged", 0) == 0
+    assert len(fake["paths"]) == 6
+
+
+def test_no_hedge_without_spare_token(fake):
+    fake["fail"] += [0.5]
+    limiter = RateLimiter(2, 1, burst=1)
+    with SRC(hedge_after=0.1, rate_limiter=limiter) as api:
+        api.get_users("u2")
+        assert api.stats().get("hedged", 0) == 0
+    assert len(fake["paths"]) == 1
+
+
+def test_async_hedging(fake):
+    fake["fail"] += [1.0]
+
+    async def main():
+        async with AsyncSRC(hedge_after=0.1) as api:
+            await api.get_users("u2")
+            hedged = api.stats()["hedged"]
+        async with AsyncSRC(
+            hedge_after=0.1, rate_limiter=RateLimiter(4, 1, burst=1)
+        ) as api:
+            await asyncio.gather(*[api.get_users(f"u{i}") for i in range(1, 7)])
+            return hedged, api.stats().get("hedged", 0)
+
+    assert asyncio.run(main()) == (1, 0)
+    assert len(fake["paths"]) == 8
@@ -0,0 +1,63 @@
+import pytest
+from srcomapipy.srcomapipy import SRC
+from srcomapipy.mirror import RunMirror
+from . import fakesrc
+
+G2_RUNS = [r for r in fakesrc.RUNS if r["game"] == "g2"]
+
+
+def _run(run_id: str) -> dict:
+    return next(r for r in fakesrc.RUNS if r["id"] == run_id)
+
+
+@pytest.fixture
+def mirror(fake):
+    with SRC() as api:
+        mirror = RunMirror(api)
+        yield mirror
+        mirror.close()
+
+
+def test_first_sync_downloads_everything(mirror):
+    delta = mirror.sync("g2")
+    assert sorted(r.id for r in delta.added) == sorted(r["id"] for r in G2_RUNS)
+    assert not (delta.verified or delta.rejected or delta.edited or delta.deleted)
+    assert len(mirror) == len(G2_RUNS)
+    assert mirror.games() == ["g2"]
+
+
+def test_sync_without_changes(mirror, fake):
+    mirror.sync("g2")
+    fakesrc.reset()
+    delta = mirror.sync("g2")
+    assert not delta
+    assert delta.requests == len(fake["paths"])
+
+
+def test_verified_rejected_and_deleted(mirror, monkeypatch):
+    mirror.sync("g2")
+    # g2r0, g2r10 and g2r20 are waiting for verification
+    verified = {"status": "verified", "verify-date": "2030-01-01T00:00:00Z"}
+    monkeypatch.setitem(_run("g2r0"), "status", verified)
+    monkeypatch.setitem(_run("g2r10"), "status", {"status": "rejected", "reason": "x"})
+    runs = [r for r in fakesrc.RUNS if r["id"] != "g2r20"]
+    monkeypatch.setattr(fakesrc, "RUNS", runs)
+    delta = mirror.sync("g2")
+    assert [r.id for r in delta.verified] == ["g2r0"]
+    assert [r.id for r in delta.rejected] == ["g2r10"]
+    assert delta.deleted == ["g2r20"]
+    assert not (delta.added or delta.edited)
+    assert "g2r20" not in mirror
+    assert [r.id for r in mirror.runs("g2", status="new")] == []
+
+
+@pytest.mark.parametrize("full", [False, True])
+def test_edited_run(mirror, monkeypatch, full):
+    mirror.sync("g2")
+    times = dict(_run("g2r5")["times"], primary_t=1)
+    monkeypatch.setitem(_run("g2r5"), "times", times)
+    delta = mirror.sync("g2", full=full)
+    assert [r.id for r in delta.edited] == ["g2r5"]
+    assert not (delta.added or delta.verified or delta.rejected or delta.deleted)
+    assert mirror.get("g2r5").data["times"]["primary_t"] == 1
+    assert not mirror.sync("g2", full=full)
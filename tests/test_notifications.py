@@ -0,0 +1,64 @@
+import asyncio
+from srcomapipy.srcomapipy import SRC
+from srcomapipy.asyncsrc import AsyncSRC
+from srcomapipy.watch import NotificationCursor
+from . import fakesrc
+
+
+def _note(i: int, created: str) -> dict:
+    return dict(fakesrc.NOTIFS[0], id=f"n{i}", created=created, text=f"note {i}")
+
+
+def test_cursor_shared_timestamps():
+    cursor = NotificationCursor()
+    first = {"id": "a", "created": "2022-01-01T00:00:00Z"}
+    same_time = {"id": "b", "created": "2022-01-01T00:00:00Z"}
+    later = {"id": "c", "created": "2022-01-01T00:00:01Z"}
+    assert cursor.is_new(first)
+    cursor.advance([first])
+    assert not cursor.is_new(first)
+    assert cursor.is_new(same_time)
+    cursor.advance([same_time])
+    assert cursor.ids == {"a", "b"}
+    assert not cursor.is_new(same_time)
+    cursor.advance([later])
+    assert (cursor.created, cursor.ids) == (later["created"], {"c"})
+    assert not cursor.is_new(first)
+
+
+def test_cursor_can_be_restored():
+    cursor = NotificationCursor("2022-01-01T00:00:00Z", ["a"])
+    assert not cursor.is_new({"id": "a", "created": "2022-01-01T00:00:00Z"})
+    assert cursor.is_new({"id": "b", "created": "2022-01-01T00:00:00Z"})
+    assert not NotificationCursor.now().is_new(fakesrc.NOTIFS[-1])
+
+
+def test_new_notifications(fake, monkeypatch):
+    cursor = NotificationCursor()
+    with SRC(api_key="key") as api:
+        notes = api.get_new_notifications(cursor)
+        # the history is read in full pages
+        assert len(notes) == len(fakesrc.NOTIFS)
+        assert len(fake["paths"]) == 2
+        assert notes[0].id == fakesrc.NOTIFS[-1]["id"]
+        assert api.get_new_notifications(cursor) == []
+        assert len(fake["paths"]) == 3
+        assert "max=20" in fake["paths"][-1][1]
+        # created at the same time as the newest one that was read
+        newest = fakesrc.NOTIFS[-1]["created"]
+        added = [_note(250, newest), _note(251, "2022-01-02T00:00:00Z")]
+        monkeypatch.setattr(fakesrc, "NOTIFS", fakesrc.NOTIFS + added)
+        assert [n.id for n in api.get_new_notifications(cursor)] == ["n251", "n250"]
+        assert api.get_new_notifications(cursor) == []
+
+
+def test_async_new_notifications(fake):
+    async def main():
+        async with AsyncSRC(api_key="key") as api:
+            cursor = NotificationCursor()
+            return await api.get_new_notifications(cursor), cursor
+
+    notes, cursor = asyncio.run(main())
+    assert len(notes) == len(fakesrc.NOTIFS)
+    assert len(fake["paths"]) == 2
+    assert cursor.created == fakesrc.NOTIFS[-1]["created"]
@@ -0,0 +1,52 @@
+import asyncio
+from srcomapipy.srcomapipy import SRC
+from srcomapipy.asyncsrc import AsyncSRC
+from . import fakesrc
+
+G1_RUNS = [r["id"] for r in fakesrc.RUNS if r["game"] == "g1"]
+
+
+def _verified(run_ids: list[str]) -> list[str]:
+    runs = {r["id"]: r for r in fakesrc.RUNS}
+    return [i for i in run_ids if runs[i]["status"]["status"] == "verified"]
+
+
+def test_every_page_is_followed(fake):
+    with SRC() as api:
+        runs = api.get_runs(game_id="g1", orderby="submitted", direction="asc")
+    assert sorted(r.id for r in runs) == sorted(_verified(G1_RUNS))
+    # 200 runs per page
+    assert len(fake["paths"]) == -(-len(runs) // 200)
+
+
+def test_limit_stops_paging(fake):
+    with SRC() as api:
+        runs = api.get_runs(game_id="g1", limit=250)
+        assert len(runs) == 250
+        assert len(fake["paths"]) == 2
+        assert len(api.get_runs(game_id="g1", limit=5)) == 5
+    # max is lowered to the limit
+    assert "max=5" in fake["paths"][-1][1]
+
+
+def test_iter_pages_limit(fake):
+    with SRC() as api:
+        pages = list(api.iter_pages("runs", {"game": "g1"}, limit=210))
+    assert [len(p) for p in pages] == [200, 10]
+
+
+def test_async_limit(fake):
+    async def main():
+        async with AsyncSRC() as api:
+            return await api.get_runs(game_id="g1", limit=250)
+
+    assert len(asyncio.run(main())) == 250
+    assert len(fake["paths"]) == 2
+
+
+def test_bulk_pages(fake):
+    with SRC() as api:
+        games = api.search_game("Game", bulk=True)
+    assert len(games) == len(fakesrc.GAMES)
+    assert all(g.bulk for g in games)
+    assert "max=1000" in fake["paths"][0][1]
@@ -0,0 +1,22 @@
+from concurrent.futures import ThreadPoolExecutor
+from srcomapipy.srctypes import Registry, Category
+from . import fakesrc
+
+
+def test_identical_payloads_share_an_instance():
+    registry = Registry()
+    data = fakesrc.embed_cat("g1c0", ["variables"])
+    first = registry.build(Category, data)
+    assert registry.build(Category, dict(data)) is first
+    changed = registry.build(Category, dict(data, name="Renamed"))
+    assert changed is not first and changed.name == "Renamed"
+    assert (registry.hits, registry.misses) == (1, 2)
+
+
+def test_counters_under_threads():
+    registry = Registry()
+    payloads = [fakesrc.embed_cat(c, []) for c in fakesrc.CATS] * 200
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        built = list(pool.map(lambda d: registry.build(Category, d), payloads))
+    assert registry.hits + registry.misses == len(payloads)
+    assert len({id(c) for c in built}) == len(fakesrc.CATS)
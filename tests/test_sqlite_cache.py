@@ -0,0 +1,54 @@
+import sqlite3
+import threading
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from srcomapipy.srcomapipy import SRC
+from srcomapipy.cache import SQLiteCache
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "cache.sqlite3")
+
+
+def test_survives_restarts(fake, path):
+    with SRC(cache=SQLiteCache(path)) as api:
+        first = api.get_users("u2")
+        api.cache.close()
+    with SRC(cache=SQLiteCache(path)) as api:
+        assert api.get_users("u2").data == first.data
+        api.cache.close()
+    assert len(fake["paths"]) == 1
+
+
+def test_close_closes_every_thread(path):
+    cache = SQLiteCache(path)
+    cache.set(("platforms", ()), [1])
+    connections = []
+
+    def use():
+        cache.get(("platforms", ()))
+        connections.append(cache._local.con)
+
+    threads = [threading.Thread(target=use) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    cache.close()
+    for con in connections:
+        with pytest.raises(sqlite3.ProgrammingError):
+            con.execute("SELECT 1")
+    # used again after closing
+    assert cache.get(("platforms", ())) == [1]
+    cache.close()
+
+
+def test_counters_under_threads(path):
+    cache = SQLiteCache(path)
+    cache.set(("platforms", ()), [1])
+    keys = [("platforms", ()), ("regions", ())] * 200
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(cache.get, keys))
+    assert (cache.hits, cache.misses) == (200, 200)
+    cache.close()
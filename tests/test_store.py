@@ -0,0 +1,55 @@
+import time
+import pytest
+from srcomapipy.srcomapipy import SRC
+from srcomapipy.store import EntityStore
+
+
+def test_lookups_after_get_game(fake):
+    with SRC() as api:
+        api.get_game("g1")
+        requests = len(fake["paths"])
+        category = api.get_category("g1c0")
+        level = api.get_level("g1l1")
+        variable = api.get_variable("g1c0v")
+        assert len(fake["paths"]) == requests
+        assert api.stats()["store_hits"] == 3
+    assert category.name == "Catg1c0"
+    assert level.name == "Lvlg1l1"
+    assert variable.name == "Varg1c0v"
+
+
+def test_lookups_match_requests(fake):
+    with SRC() as api:
+        api.get_game("g1")
+        stored = api.get_category("g1c0").data
+    with SRC() as api:
+        assert api.get_category("g1c0").data == stored
+
+
+def test_expired_entities_are_requested(fake):
+    with SRC(store=EntityStore(ttl=0.05)) as api:
+        api.get_game("g1")
+        time.sleep(0.1)
+        requests = len(fake["paths"])
+        api.get_category("g1c0")
+    assert len(fake["paths"]) == requests + 1
+
+
+def test_invalidated_entities_are_requested(fake):
+    with SRC() as api:
+        api.get_game("g1")
+        api.invalidate("categories")
+        requests = len(fake["paths"])
+        api.get_category("g1c0")
+        assert len(fake["paths"]) == requests + 1
+        api.get_variable("g1c0v")
+        assert len(fake["paths"]) == requests + 1
+
+
+def test_max_entries():
+    store = EntityStore(max_entries=2)
+    for i in range(3):
+        store.add_response(f"platforms/p{i}", {"id": f"p{i}", "name": "PC"})
+    assert len(store) == 2
+    assert store.lookup("platforms", "p0") is None
+    assert store.lookup("platforms", "p2") == {"id": "p2", "name": "PC"}
@@ -0,0 +1,39 @@
+import json
+import pytest
+from srcomapipy.srcomapipy import SRC
+from srcomapipy.stream import StreamParser
+
+BODY = json.dumps(
+    {"data": [{"size": 12345, "x": [1, 2]}, 7, 123456], "pagination": {"size": 12345}}
+).encode()
+
+
+@pytest.mark.parametrize("step", [1, 2, 3, 7, len(BODY)])
+def test_chunks_split_anywhere(step):
+    parser = StreamParser()
+    items = []
+    for i in range(0, len(BODY), step):
+        items += parser.feed(BODY[i : i + step])
+    parser.close()
+    assert items == [{"size": 12345, "x": [1, 2]}, 7, 123456]
+    assert parser.fields == {"pagination": {"size": 12345}}
+
+
+def test_number_split_across_chunks():
+    parser = StreamParser()
+    items = parser.feed(b'{"data": [{"size": 12') + parser.feed(b'345}], "n": 12')
+    items += parser.feed(b"3}")
+    parser.close()
+    assert items == [{"size": 12345}]
+    assert parser.fields == {"n": 123}
+
+
+def test_data_that_is_not_a_list():
+    with pytest.raises(ValueError):
+        StreamParser().feed(b'{"data": {"id": "g1"}}')
+
+
+def test_iter_stream_single_resource(fake):
+    with SRC() as api:
+        with pytest.raises(ValueError):
+            list(api.iter_stream("games/g1"))
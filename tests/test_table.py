@@ -0,0 +1,66 @@
+import math
+import pytest
+from srcomapipy.table import RunTable
+
+
+def _run(run_id: str, platform: str, time: float, value: str) -> dict:
+    return {
+        "id": run_id,
+        "game": "g1",
+        "category": "c1",
+        "level": None,
+        "date": "2020-05-05",
+        "submitted": "2020-05-05T00:00:00Z",
+        "status": {"status": "verified", "verify-date": "2020-05-06T00:00:00Z"},
+        "times": {
+            "primary_t": time,
+            "realtime_t": time,
+            "ingame_t": 0,
+            "realtime_noloads_t": 0,
+        },
+        "system": {"platform": platform, "region": None, "emulated": False},
+        "values": {"v1": value},
+    }
+
+
+RUNS = [_run("r1", "zz", 30, "b"), _run("r2", "aa", 10, "c"), _run("r3", "mm", 20, "a")]
+TABLE = RunTable.from_runs(RUNS)
+
+
+def test_sort_by_time():
+    assert list(TABLE.sort("primary")) == ["r2", "r3", "r1"]
+    assert math.isnan(TABLE.times["ingametime"][0])
+
+
+def test_sort_coded_columns_by_value():
+    assert list(TABLE.sort("platform")) == ["r2", "r3", "r1"]
+    assert list(TABLE.sort("platform", reverse=True)) == ["r1", "r3", "r2"]
+    assert list(TABLE.sort("v1")) == ["r3", "r1", "r2"]
+
+
+def test_missing_values_go_last():
+    table = RunTable.from_runs([_run("r4", None, 5, "a"), *RUNS[:2]])
+    assert list(table.sort("platform")) == ["r2", "r1", "r4"]
+
+
+def test_to_numpy():
+    numpy = pytest.importorskip("numpy")
+    table = RunTable.from_runs(RUNS)
+    times = table.to_numpy("primary")
+    assert times.dtype == numpy.float64
+    assert times.tolist() == [30, 10, 20]
+    # shared with the table, so it can't grow until the array is gone
+    with pytest.raises(BufferError):
+        table.append(_run("r4", "aa", 40, "a"))
+    del times
+    columns = RunTable.from_runs(RUNS).to_numpy(copy=True)
+    assert columns["platform"].tolist() == [0, 1, 2]
+    assert columns["verified"].dtype == numpy.int32
+
+
+def test_to_numpy_copy_allows_append():
+    pytest.importorskip("numpy")
+    table = RunTable.from_runs(RUNS)
+    times = table.to_numpy("primary", copy=True)
+    table.append(_run("r4", "aa", 40, "a"))
+    assert len(table) == 4 and times.tolist() == [30, 10, 20]